@@ -0,0 +1,53 @@
+"""Add a composite index for ordered per-dataset row scans.
+
+Revision ID: 20260301_003
+Revises: 20260221_002
+Create Date: 2026-03-01
+"""
+
+from __future__ import annotations
+
+import sqlalchemy as sa
+from alembic import op
+
+
+revision = "20260301_003"
+down_revision = "20260221_002"
+branch_labels = None
+depends_on = None
+
+INDEX_NAME = "ix_data_rows_tenant_ds_id"
+
+
+def _has_table(name: str) -> bool:
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    return name in set(inspector.get_table_names())
+
+
+def _has_index(table_name: str, index_name: str) -> bool:
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    return index_name in {index["name"] for index in inspector.get_indexes(table_name)}
+
+
+def upgrade() -> None:
+    if not _has_table("data_rows") or _has_index("data_rows", INDEX_NAME):
+        return
+
+    if op.get_bind().dialect.name == "postgresql":
+        # CONCURRENTLY can't run inside a transaction, and avoids locking writes on a large table.
+        with op.get_context().autocommit_block():
+            op.create_index(
+                INDEX_NAME,
+                "data_rows",
+                ["tenant_id", "dataset_id", "id"],
+                postgresql_concurrently=True,
+            )
+    else:
+        op.create_index(INDEX_NAME, "data_rows", ["tenant_id", "dataset_id", "id"])
+
+
+def downgrade() -> None:
+    if _has_table("data_rows") and _has_index("data_rows", INDEX_NAME):
+        op.drop_index(INDEX_NAME, table_name="data_rows")
@@ -0,0 +1,48 @@
+"""Add a composite index for latest-dataset-per-tenant lookups.
+
+Revision ID: 20260301_004
+Revises: 20260301_003
+Create Date: 2026-03-01
+"""
+
+from __future__ import annotations
+
+import sqlalchemy as sa
+from alembic import op
+
+
+revision = "20260301_004"
+down_revision = "20260301_003"
+branch_labels = None
+depends_on = None
+
+INDEX_NAME = "ix_datasets_tenant_created"
+
+
+def _has_table(name: str) -> bool:
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    return name in set(inspector.get_table_names())
+
+
+def _has_index(table_name: str, index_name: str) -> bool:
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    return index_name in {index["name"] for index in inspector.get_indexes(table_name)}
+
+
+def upgrade() -> None:
+    if not _has_table("datasets") or _has_index("datasets", INDEX_NAME):
+        return
+
+    columns = ["tenant_id", sa.text("created_at DESC")]
+    if op.get_bind().dialect.name == "postgresql":
+        with op.get_context().autocommit_block():
+            op.create_index(INDEX_NAME, "datasets", columns, postgresql_concurrently=True)
+    else:
+        op.create_index(INDEX_NAME, "datasets", columns)
+
+
+def downgrade() -> None:
+    if _has_table("datasets") and _has_index("datasets", INDEX_NAME):
+        op.drop_index(INDEX_NAME, table_name="datasets")
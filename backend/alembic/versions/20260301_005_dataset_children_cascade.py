@@ -0,0 +1,68 @@
+"""Cascade dataset deletes to data rows and AI queries.
+
+Revision ID: 20260301_005
+Revises: 20260301_004
+Create Date: 2026-03-01
+"""
+
+from __future__ import annotations
+
+import sqlalchemy as sa
+from alembic import op
+
+
+revision = "20260301_005"
+down_revision = "20260301_004"
+branch_labels = None
+depends_on = None
+
+CHILD_TABLES = ("data_rows", "ai_queries")
+
+
+def _has_table(name: str) -> bool:
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    return name in set(inspector.get_table_names())
+
+
+def _dataset_foreign_keys(table_name: str) -> list[dict]:
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    return [
+        fk
+        for fk in inspector.get_foreign_keys(table_name)
+        if fk["referred_table"] == "datasets" and fk["constrained_columns"] == ["dataset_id"]
+    ]
+
+
+def _replace_dataset_foreign_key(table_name: str, ondelete: str | None) -> None:
+    for fk in _dataset_foreign_keys(table_name):
+        if (fk.get("options") or {}).get("ondelete") == ondelete:
+            continue
+        op.drop_constraint(fk["name"], table_name, type_="foreignkey")
+        op.create_foreign_key(
+            fk["name"],
+            table_name,
+            "datasets",
+            ["dataset_id"],
+            ["id"],
+            ondelete=ondelete,
+        )
+
+
+def upgrade() -> None:
+    # SQLite cannot alter constraints in place and does not enforce them by default; the app
+    # deletes child rows explicitly there.
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    for table_name in CHILD_TABLES:
+        if _has_table(table_name):
+            _replace_dataset_foreign_key(table_name, "CASCADE")
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    for table_name in CHILD_TABLES:
+        if _has_table(table_name):
+            _replace_dataset_foreign_key(table_name, None)
@@ -0,0 +1,108 @@
+"""Track Batch API state for AI queries in dedicated columns.
+
+Revision ID: 20260301_006
+Revises: 20260301_005
+Create Date: 2026-03-01
+"""
+
+from __future__ import annotations
+
+import sqlalchemy as sa
+from alembic import op
+
+
+revision = "20260301_006"
+down_revision = "20260301_005"
+branch_labels = None
+depends_on = None
+
+INDEX_NAME = "ix_ai_queries_batch_pending"
+PENDING_PREDICATE = "batch_status IN ('queued', 'submitting', 'submitted')"
+
+
+def _has_table(name: str) -> bool:
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    return name in set(inspector.get_table_names())
+
+
+def _has_column(table_name: str, column_name: str) -> bool:
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    columns = {column["name"] for column in inspector.get_columns(table_name)}
+    return column_name in columns
+
+
+def _has_index(table_name: str, index_name: str) -> bool:
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    return index_name in {index["name"] for index in inspector.get_indexes(table_name)}
+
+
+def _move_legacy_batch_state() -> None:
+    # Earlier batch queries kept their state, including the full request body, in result_data.
+    bind = op.get_bind()
+    ai_queries = sa.table(
+        "ai_queries",
+        sa.column("id", sa.Integer),
+        sa.column("generated_code", sa.Text),
+        sa.column("result_data", sa.JSON),
+        sa.column("batch_status", sa.String),
+        sa.column("batch_id", sa.String),
+        sa.column("batch_request", sa.JSON),
+    )
+    rows = bind.execute(
+        sa.select(ai_queries.c.id, ai_queries.c.result_data).where(ai_queries.c.generated_code.is_(None))
+    ).all()
+    for row in rows:
+        result_data = dict(row.result_data or {})
+        batch = result_data.get("batch")
+        if not isinstance(batch, dict):
+            continue
+        request = batch.pop("request", None)
+        bind.execute(
+            ai_queries.update()
+            .where(ai_queries.c.id == row.id)
+            .values(
+                batch_status=batch.get("status"),
+                batch_id=batch.get("batch_id"),
+                batch_request=request,
+                result_data={**result_data, "batch": batch},
+            )
+        )
+
+
+def upgrade() -> None:
+    if not _has_table("ai_queries"):
+        return
+
+    if not _has_column("ai_queries", "batch_status"):
+        op.add_column("ai_queries", sa.Column("batch_status", sa.String(length=20), nullable=True))
+    if not _has_column("ai_queries", "batch_id"):
+        op.add_column("ai_queries", sa.Column("batch_id", sa.String(length=100), nullable=True))
+    if not _has_column("ai_queries", "batch_attempts"):
+        op.add_column(
+            "ai_queries",
+            sa.Column("batch_attempts", sa.Integer(), nullable=False, server_default="0"),
+        )
+    if not _has_column("ai_queries", "batch_claimed_at"):
+        op.add_column("ai_queries", sa.Column("batch_claimed_at", sa.DateTime(timezone=True), nullable=True))
+    if not _has_column("ai_queries", "batch_request"):
+        op.add_column("ai_queries", sa.Column("batch_request", sa.JSON(), nullable=True))
+
+    _move_legacy_batch_state()
+
+    if not _has_index("ai_queries", INDEX_NAME):
+        op.create_index(
+            INDEX_NAME,
+            "ai_queries",
+            ["batch_status", "id"],
+            postgresql_where=sa.text(PENDING_PREDICATE),
+            sqlite_where=sa.text(PENDING_PREDICATE),
+        )
+
+
+def downgrade() -> None:
+    if _has_table("ai_queries") and _has_index("ai_queries", INDEX_NAME):
+        op.drop_index(INDEX_NAME, table_name="ai_queries")
+    # Column drops are intentionally skipped for SQLite compatibility.
@@ -1,8 +1,10 @@
 import hmac
-from dataclasses import dataclass
+import time
+from typing import NamedTuple
 
 from fastapi import Depends, Header, HTTPException, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+from sqlalchemy import bindparam, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.config import get_settings
@@ -13,23 +15,25 @@ from app.security import decode_access_token
 _bearer_scheme = HTTPBearer(auto_error=False)
 settings = get_settings()
 
+# user_id -> (tenant_id, is_active, role, expires_at). Kept small and short-lived so
+# deactivations propagate within one TTL without a DB round-trip on every request.
+_USER_CACHE: dict[int, tuple[int, bool, str, float]] = {}
+_USER_CACHE_MAX_ENTRIES = 10_000
 
-@dataclass(frozen=True)
-class RequestContext:
+# Only the columns auth needs; skips ORM hydration of a full User on cache misses.
+_USER_AUTH_STMT = select(User.tenant_id, User.is_active, User.role).where(User.id == bindparam("uid"))
+
+
+class RequestContext(NamedTuple):
     tenant_id: int
     user_id: int
     role: str
 
 
-def _expected_api_token() -> str:
-    token = (settings.mvp_api_token or "").strip()
-    if token:
-        return token
-
-    if not settings.is_production and settings.allow_dev_auth_fallback:
-        return "dev-insecure-token"
-
-    return ""
+# Settings are frozen for the lifetime of the process, so resolve the legacy token once.
+_EXPECTED_API_TOKEN: str = (settings.mvp_api_token or "").strip() or (
+    "dev-insecure-token" if not settings.is_production and settings.allow_dev_auth_fallback else ""
+)
 
 
 def _unauthorized(detail: str = "Unauthorized") -> None:
@@ -46,87 +50,108 @@ def _extract_bearer_token(credentials: HTTPAuthorizationCredentials | None) -> s
     return ""
 
 
+def invalidate_cached_user(user_id: int) -> None:
+    """Drop a user's cached auth state; call after any write to a User row.
+
+    The cache is per process, so this only clears the calling process. Changes made by other
+    processes or directly in the database become visible after auth_user_cache_ttl_seconds.
+    """
+    _USER_CACHE.pop(user_id, None)
+
+
+async def _load_user_auth_state(db: AsyncSession, user_id: int) -> tuple[int, bool, str] | None:
+    now = time.monotonic()
+    cached = _USER_CACHE.pop(user_id, None)
+    if cached is not None and cached[3] > now:
+        # Re-insert to keep dict order least-recently-used first.
+        _USER_CACHE[user_id] = cached
+        return cached[0], cached[1], cached[2]
+
+    row = (await db.execute(_USER_AUTH_STMT, {"uid": user_id})).first()
+    if row is None:
+        return None
+
+    state = (row.tenant_id, bool(row.is_active), row.role)
+    _USER_CACHE[user_id] = (*state, now + settings.auth_user_cache_ttl_seconds)
+    while len(_USER_CACHE) > _USER_CACHE_MAX_ENTRIES:
+        _USER_CACHE.pop(next(iter(_USER_CACHE)))
+    return state
+
+
 async def _get_user_or_forbidden(
     *,
     db: AsyncSession,
     user_id: int,
     tenant_id: int,
-) -> User:
-    user = await db.get(User, user_id)
-    if user is None or not user.is_active:
+) -> RequestContext:
+    state = await _load_user_auth_state(db, user_id)
+    if state is None or not state[1]:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="User not found or inactive")
-    if user.tenant_id != tenant_id:
+    user_tenant_id, _, role = state
+    if user_tenant_id != tenant_id:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="User does not belong to requested tenant",
         )
-    return user
+    return RequestContext(tenant_id=user_tenant_id, user_id=user_id, role=role)
 
 
-async def _authenticate_with_legacy_token(
+def _identity_from_legacy_token(
     *,
     token: str,
     x_tenant_id: int | None,
     x_user_id: int | None,
-    db: AsyncSession,
-) -> User:
-    expected_token = _expected_api_token()
-    if not expected_token:
+) -> tuple[int, int]:
+    # The expected length is static config, so checking it first leaks nothing and skips the
+    # digest for mismatched tokens; equal-length candidates still get a constant-time compare.
+    if not _EXPECTED_API_TOKEN or len(token) != len(_EXPECTED_API_TOKEN):
         _unauthorized()
-    if not hmac.compare_digest(token, expected_token):
+    if not hmac.compare_digest(token, _EXPECTED_API_TOKEN):
         _unauthorized()
 
-    tenant_id = x_tenant_id or 1
-    user_id = x_user_id or 1
-    return await _get_user_or_forbidden(db=db, user_id=user_id, tenant_id=tenant_id)
+    return x_user_id or 1, x_tenant_id or 1
 
 
-async def _authenticate_with_jwt(
-    *,
-    token: str,
-    db: AsyncSession,
-) -> User:
+def _identity_from_jwt(token: str) -> tuple[int, int]:
     try:
         claims = decode_access_token(token)
     except ValueError:
         _unauthorized("Invalid or expired token.")
 
-    try:
-        user_id = int(claims["sub"])
-        tenant_id = int(claims["tenant_id"])
-    except (ValueError, TypeError, KeyError):
-        _unauthorized("Invalid token payload.")
-
-    return await _get_user_or_forbidden(db=db, user_id=user_id, tenant_id=tenant_id)
+    return claims.sub, claims.tenant_id
 
 
-async def get_current_user(
+async def _verified_identity(
     credentials: HTTPAuthorizationCredentials | None = Depends(_bearer_scheme),
     x_tenant_id: int | None = Header(default=None, alias="X-Tenant-Id"),
     x_user_id: int | None = Header(default=None, alias="X-User-Id"),
-    db: AsyncSession = Depends(get_db),
-) -> User:
+) -> tuple[int, int]:
+    """Validate the bearer token and return (user_id, tenant_id) without touching the database."""
     token = _extract_bearer_token(credentials)
     if not token:
         _unauthorized()
 
-    expected_token = _expected_api_token()
-    if expected_token and hmac.compare_digest(token, expected_token):
-        return await _authenticate_with_legacy_token(
-            token=token,
-            x_tenant_id=x_tenant_id,
-            x_user_id=x_user_id,
-            db=db,
-        )
+    # JWTs always have three dot-separated segments; anything else can only be the legacy token.
+    if token.count(".") == 2:
+        return _identity_from_jwt(token)
 
-    return await _authenticate_with_jwt(token=token, db=db)
+    return _identity_from_legacy_token(token=token, x_tenant_id=x_tenant_id, x_user_id=x_user_id)
 
 
 async def get_request_context(
-    current_user: User = Depends(get_current_user),
+    # Declared before get_db so unauthenticated requests are rejected before a session is opened.
+    identity: tuple[int, int] = Depends(_verified_identity),
+    db: AsyncSession = Depends(get_db),
 ) -> RequestContext:
-    return RequestContext(
-        tenant_id=current_user.tenant_id,
-        user_id=current_user.id,
-        role=current_user.role,
-    )
+    user_id, tenant_id = identity
+    return await _get_user_or_forbidden(db=db, user_id=user_id, tenant_id=tenant_id)
+
+
+async def get_current_user(
+    context: RequestContext = Depends(get_request_context),
+    db: AsyncSession = Depends(get_db),
+) -> User:
+    user = await db.get(User, context.user_id)
+    if user is None:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="User not found or inactive")
+    return user
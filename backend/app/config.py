@@ -1,4 +1,4 @@
-from functools import lru_cache
+from functools import cached_property, lru_cache
 from typing import Literal
 
 from pydantic import Field, ValidationError, field_validator, model_validator
@@ -19,6 +19,11 @@ class Settings(BaseSettings):
     environment: Literal["development", "staging", "production"] = "development"
     database_url: str = "sqlite+aiosqlite:///./smart_spreadsheet.db"
     sql_echo: bool = False
+    # Connection pool sizing; ignored for SQLite, which doesn't use a QueuePool.
+    db_pool_size: int = 20
+    db_max_overflow: int = 10
+    db_pool_timeout: int = 30
+    db_pool_recycle: int = 1800
     auto_create_schema: bool = True
     # Example seeding is opt-in. A real SaaS flow should start with signup.
     auto_seed_mvp_records: bool = False
@@ -28,6 +33,7 @@ class Settings(BaseSettings):
 
     auth_jwt_secret: str | None = None
     auth_access_token_expire_minutes: int = 60 * 24
+    auth_user_cache_ttl_seconds: int = 30
 
     mvp_api_token: str | None = None
     # Legacy service-token fallback is opt-in for local dev only.
@@ -41,17 +47,31 @@ class Settings(BaseSettings):
     trusted_hosts: list[str] = Field(default_factory=lambda: ["localhost", "127.0.0.1", "backend"])
     enable_https_redirect: bool = False
     enable_api_docs: bool = True
+    # Compression belongs at the edge proxy in production; this only covers direct local access.
+    enable_gzip: bool = True
+    gzip_minimum_size: int = 8192
 
     max_upload_size_bytes: int = 10 * 1024 * 1024
     max_upload_rows: int = 250000
     max_upload_columns: int = 250
     max_upload_cell_length: int = 10000
+    # CSV rows converted to dicts and inserted per step during uploads.
+    upload_chunk_rows: int = 50000
     overview_cache_ttl_seconds: int = 30
+    insights_cache_ttl_seconds: int = 600
+    # PostgreSQL only: caps the AI routes' row scans so one slow dataset can't pin a pool connection.
+    ai_scan_statement_timeout_ms: int = 2000
+    llm_cache_enabled: bool = True
+    llm_cache_ttl_seconds: int = 3600
+    llm_cache_max_entries: int = 512
     redis_url: str | None = None
     rate_limit_backend: Literal["auto", "memory", "redis"] = "auto"
     enable_connector_scheduler: bool = True
     run_schedulers: bool = False
     connector_scheduler_interval_seconds: int = 120
+    # Submits /ai/query?mode=batch requests to the OpenAI Batch API and collects finished results.
+    enable_ai_batch_worker: bool = True
+    ai_batch_interval_seconds: int = 60
     connector_sync_trigger_secret: str | None = None
 
     # Only used when AUTO_SEED_MVP_RECORDS or init_db example seeding is enabled.
@@ -97,10 +117,13 @@ class Settings(BaseSettings):
         if value is None:
             return []
         if isinstance(value, list):
-            return [str(v).strip() for v in value if str(v).strip()]
-        if isinstance(value, str):
-            return [part.strip() for part in value.split(",") if part.strip()]
-        return []
+            parts = [str(v).strip() for v in value]
+        elif isinstance(value, str):
+            parts = [part.strip() for part in value.split(",")]
+        else:
+            return []
+        # Drop blanks and duplicates while keeping the configured order.
+        return list(dict.fromkeys(part for part in parts if part))
 
     @field_validator("redis_url", "connector_sync_trigger_secret", mode="before")
     @classmethod
@@ -144,8 +167,9 @@ class Settings(BaseSettings):
                 )
         return self
 
-    @property
+    @cached_property
     def is_production(self) -> bool:
+        # Read on hot paths; environment is fixed once settings are loaded.
         return self.environment == "production"
 
 
@@ -162,6 +186,8 @@ def get_settings() -> Settings:
             settings.enable_https_redirect = True
         if settings.enable_api_docs:
             settings.enable_api_docs = False
+        if settings.enable_gzip:
+            settings.enable_gzip = False
         if settings.allow_vercel_preview_origins:
             settings.allow_vercel_preview_origins = False
         if settings.rate_limit_backend == "auto":
@@ -169,5 +195,6 @@ def get_settings() -> Settings:
         # Schedulers should run only on explicitly designated worker processes.
         if not settings.run_schedulers:
             settings.enable_connector_scheduler = False
+            settings.enable_ai_batch_worker = False
 
     return settings
@@ -1,3 +1,4 @@
+import orjson
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import declarative_base
 
@@ -5,10 +6,33 @@ from app.config import get_settings
 
 settings = get_settings()
 
+_engine_kwargs: dict = {}
+if not settings.database_url.startswith("sqlite"):
+    _engine_kwargs.update(
+        pool_size=settings.db_pool_size,
+        max_overflow=settings.db_max_overflow,
+        pool_timeout=settings.db_pool_timeout,
+        pool_recycle=settings.db_pool_recycle,
+    )
+
+
+def dumps_json(value) -> str:
+    # JSON columns (row_data, result_data, insights) are written on hot paths; orjson is several
+    # times faster than stdlib json and handles numpy scalars that come out of pandas.
+    return orjson.dumps(
+        value,
+        default=str,
+        option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY,
+    ).decode()
+
+
 engine = create_async_engine(
     settings.database_url,
     echo=settings.sql_echo,
     pool_pre_ping=True,
+    json_serializer=dumps_json,
+    json_deserializer=orjson.loads,
+    **_engine_kwargs,
 )
 AsyncSessionLocal = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
 
@@ -18,3 +42,8 @@ Base = declarative_base()
 async def get_db():
     async with AsyncSessionLocal() as session:
         yield session
+
+
+def get_session_factory() -> async_sessionmaker[AsyncSession]:
+    """Expose the session factory for handlers that run independent queries concurrently."""
+    return AsyncSessionLocal
@@ -1,27 +1,36 @@
 from contextlib import asynccontextmanager
+from functools import lru_cache
 import contextlib
+import hashlib
+import json
 import logging
 import asyncio
+import time
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.gzip import GZipMiddleware
-from sqlalchemy import select, text
+from sqlalchemy import select, text, update
 from sqlalchemy.ext.asyncio import AsyncSession
 from starlette.middleware.httpsredirect import HTTPSRedirectMiddleware
 from starlette.middleware.trustedhost import TrustedHostMiddleware
 
+from app.auth import invalidate_cached_user
 from app.config import get_settings
 from app.database import AsyncSessionLocal, Base, engine
 from app.middleware import RequestIdMiddleware, SecurityHeadersMiddleware
 from app.models import Tenant, User
 from app.routers import ai, auth, billing, cleaning, connectors, datasets, events, india, overview, reports, workspace
 from app.security import get_password_hash
+from app.services.ai_batch_service import run_ai_batch_cycle
+from app.services.ai_service import close_ai_service
 from app.services.connectors_service import run_due_connector_syncs
 
 settings = get_settings()
 logger = logging.getLogger("app.main")
 
+_PLACEHOLDER_PASSWORD_HASHES = frozenset({"mvp-placeholder-password", "hashed_password_here"})
+
 
 def _configure_logging() -> None:
     level = logging.INFO if settings.is_production else logging.DEBUG
@@ -31,27 +40,38 @@ def _configure_logging() -> None:
     )
 
 
+@lru_cache(maxsize=1)
+def _default_admin_password_hash() -> str:
+    # Password hashing is deliberately slow; compute it at most once per process, and only when needed.
+    return get_password_hash(settings.default_admin_password)
+
+
 async def ensure_default_mvp_records() -> None:
     """Seed a single demo tenant/user for local MVP mode."""
     if not settings.auto_seed_mvp_records:
         return
 
+    subdomain = settings.default_tenant_subdomain
+    email = settings.default_admin_email
+    # Gather every existence check in a single round-trip.
+    seed_state_stmt = select(
+        select(Tenant.id).where(Tenant.id == 1).scalar_subquery().label("tenant_id"),
+        select(Tenant.id).where(Tenant.subdomain == subdomain).limit(1).scalar_subquery().label("subdomain_owner"),
+        select(User.id).where(User.id == 1).scalar_subquery().label("user_id"),
+        select(User.hashed_password).where(User.id == 1).scalar_subquery().label("user_password_hash"),
+        select(User.id).where(User.email == email).limit(1).scalar_subquery().label("email_owner"),
+    )
+
     async with AsyncSessionLocal() as session:
-        tenant = await session.get(Tenant, 1)
-        if tenant is None:
-            subdomain = settings.default_tenant_subdomain
-            subdomain_exists = await session.execute(
-                select(Tenant).where(Tenant.subdomain == subdomain).limit(1)
-            )
-            if subdomain_exists.scalar_one_or_none():
+        seed_state = (await session.execute(seed_state_stmt)).one()
+
+        if seed_state.tenant_id is None:
+            if seed_state.subdomain_owner is not None:
                 subdomain = f"{subdomain}-mvp"
             session.add(Tenant(id=1, name=settings.default_tenant_name, subdomain=subdomain))
 
-        user = await session.get(User, 1)
-        if user is None:
-            email = settings.default_admin_email
-            email_exists = await session.execute(select(User).where(User.email == email).limit(1))
-            if email_exists.scalar_one_or_none():
+        if seed_state.user_id is None:
+            if seed_state.email_owner is not None:
                 email = "mvp-admin@example.local"
             session.add(
                 User(
@@ -59,20 +79,24 @@ async def ensure_default_mvp_records() -> None:
                     tenant_id=1,
                     email=email,
                     full_name="Admin User",
-                    hashed_password=get_password_hash(settings.default_admin_password),
+                    hashed_password=_default_admin_password_hash(),
                     role="admin",
                     is_active=True,
                 )
             )
-        elif user.hashed_password in {"mvp-placeholder-password", "hashed_password_here"}:
-            user.hashed_password = get_password_hash(settings.default_admin_password)
+        elif seed_state.user_password_hash in _PLACEHOLDER_PASSWORD_HASHES:
+            await session.execute(
+                update(User).where(User.id == 1).values(hashed_password=_default_admin_password_hash())
+            )
         await session.commit()
+    invalidate_cached_user(1)
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     _configure_logging()
     scheduler_task: asyncio.Task | None = None
+    ai_batch_task: asyncio.Task | None = None
     if settings.auto_create_schema:
         async with engine.begin() as conn:
             await conn.run_sync(Base.metadata.create_all)
@@ -87,12 +111,25 @@ async def lifespan(app: FastAPI):
                 await asyncio.sleep(max(15, int(settings.connector_scheduler_interval_seconds)))
 
         scheduler_task = asyncio.create_task(_scheduler_loop())
+    if settings.enable_ai_batch_worker and ai.client is not None:
+        async def _ai_batch_loop() -> None:
+            while True:
+                try:
+                    await run_ai_batch_cycle(ai.client)
+                except Exception as exc:
+                    logger.exception("AI batch worker iteration failed: %s", str(exc))
+                await asyncio.sleep(max(15, int(settings.ai_batch_interval_seconds)))
+
+        ai_batch_task = asyncio.create_task(_ai_batch_loop())
     logger.info("Application started in %s mode", settings.environment)
     yield
-    if scheduler_task:
-        scheduler_task.cancel()
-        with contextlib.suppress(asyncio.CancelledError):
-            await scheduler_task
+    for task in (scheduler_task, ai_batch_task):
+        if task:
+            task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await task
+    await ai.close_openai_client()
+    await close_ai_service()
     await engine.dispose()
 
 
@@ -105,16 +142,18 @@ app = FastAPI(
 
 app.add_middleware(RequestIdMiddleware)
 app.add_middleware(SecurityHeadersMiddleware)
-app.add_middleware(GZipMiddleware, minimum_size=1024)
+if settings.enable_gzip:
+    app.add_middleware(GZipMiddleware, minimum_size=settings.gzip_minimum_size)
 app.add_middleware(TrustedHostMiddleware, allowed_hosts=settings.trusted_hosts or ["*"])
 
 if settings.enable_https_redirect:
     app.add_middleware(HTTPSRedirectMiddleware)
 
+# Starlette compiles the regex once at startup; a frozenset keeps exact-origin checks O(1).
 allow_origin_regex = r"https://.*\.vercel\.app" if settings.allow_vercel_preview_origins else None
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=settings.allowed_origins,
+    allow_origins=frozenset(settings.allowed_origins),
     allow_credentials=True,
     allow_methods=["GET", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"],
     allow_headers=["Authorization", "Content-Type", "X-Tenant-Id", "X-User-Id", "X-Request-Id"],
@@ -134,18 +173,43 @@ app.include_router(events.router)
 app.include_router(india.router)
 
 
+def _static_json(payload: dict) -> tuple[bytes, str]:
+    body = json.dumps(payload, separators=(",", ":")).encode()
+    return body, f'"{hashlib.sha1(body).hexdigest()[:16]}"'
+
+
+_ROOT_BODY, _ROOT_ETAG = _static_json({"message": "Smart Spreadsheet Backend API is running"})
+_HEALTH_BODY, _HEALTH_ETAG = _static_json({"status": "ok", "environment": settings.environment})
+_READY_BODY, _READY_ETAG = _static_json({"status": "ready"})
+# Probes hit /ready every few seconds per instance; re-run the DB check at most once per interval.
+_READY_CHECK_INTERVAL_SECONDS = 1.0
+_ready_checked_at: float | None = None
+
+
+def _static_json_response(request: Request, body: bytes, etag: str) -> Response:
+    headers = {"ETag": etag, "Cache-Control": "max-age=1"}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
 @app.get("/", tags=["Health"])
-async def root():
-    return {"message": "Smart Spreadsheet Backend API is running"}
+async def root(request: Request):
+    return _static_json_response(request, _ROOT_BODY, _ROOT_ETAG)
 
 
 @app.get("/health", tags=["Health"])
-async def health_check():
-    return {"status": "ok", "environment": settings.environment}
+async def health_check(request: Request):
+    return _static_json_response(request, _HEALTH_BODY, _HEALTH_ETAG)
 
 
 @app.get("/ready", tags=["Health"])
-async def readiness_check():
-    async with AsyncSessionLocal() as session:  # type: AsyncSession
-        await session.execute(text("SELECT 1"))
-    return {"status": "ready"}
+async def readiness_check(request: Request):
+    global _ready_checked_at
+    now = time.monotonic()
+    if _ready_checked_at is None or now - _ready_checked_at >= _READY_CHECK_INTERVAL_SECONDS:
+        async with AsyncSessionLocal() as session:  # type: AsyncSession
+            await session.execute(text("SELECT 1"))
+        # Only successful checks are remembered, so a failing database is re-probed every time.
+        _ready_checked_at = now
+    return _static_json_response(request, _READY_BODY, _READY_ETAG)
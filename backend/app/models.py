@@ -1,4 +1,5 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, JSON, Boolean, Float
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, JSON, Boolean, Float, Index, text
+from sqlalchemy.orm import deferred
 from sqlalchemy.sql import func
 from app.database import Base
 
@@ -41,16 +42,22 @@ class Dataset(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
+    # "Latest dataset for a tenant" lookups walk this index instead of sorting the tenant's rows.
+    __table_args__ = (Index("ix_datasets_tenant_created", "tenant_id", created_at.desc()),)
+
 class DataRow(Base):
     """Stores actual data rows for datasets (simplified for MVP)"""
     __tablename__ = "data_rows"
     
     id = Column(Integer, primary_key=True, index=True)
     tenant_id = Column(Integer, ForeignKey("tenants.id"), nullable=False, index=True)
-    dataset_id = Column(Integer, ForeignKey("datasets.id"), nullable=False, index=True)
+    dataset_id = Column(Integer, ForeignKey("datasets.id", ondelete="CASCADE"), nullable=False, index=True)
     row_data = Column(JSON, nullable=False)  # Actual row data as JSON
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
+    # Serves the ordered "first N rows of a dataset" scans without a sort.
+    __table_args__ = (Index("ix_data_rows_tenant_ds_id", "tenant_id", "dataset_id", "id"),)
+
 class AIQuery(Base):
     """Stores AI-generated queries and results"""
     __tablename__ = "ai_queries"
@@ -58,12 +65,31 @@ class AIQuery(Base):
     id = Column(Integer, primary_key=True, index=True)
     tenant_id = Column(Integer, ForeignKey("tenants.id"), nullable=False, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
-    dataset_id = Column(Integer, ForeignKey("datasets.id"), nullable=False)
+    dataset_id = Column(Integer, ForeignKey("datasets.id", ondelete="CASCADE"), nullable=False)
     prompt = Column(Text, nullable=False)
     generated_code = Column(Text)  # Python/SQL code
     result_data = Column(JSON)  # Query results
     execution_time_ms = Column(Integer)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+    # Batch API queries only: queued -> submitting -> submitted -> completed | failed.
+    batch_status = Column(String(20))
+    batch_id = Column(String(100))
+    batch_attempts = Column(Integer, nullable=False, default=0, server_default="0")
+    batch_claimed_at = Column(DateTime(timezone=True))
+    # Chat completion body sent to the Batch API. Kept out of result_data, which is returned to
+    # clients, and deferred so listing queries never loads it.
+    batch_request = deferred(Column(JSON))
+
+    # Partial so the batch worker's scans only touch in-flight rows, not every interactive query.
+    __table_args__ = (
+        Index(
+            "ix_ai_queries_batch_pending",
+            "batch_status",
+            "id",
+            postgresql_where=text("batch_status IN ('queued', 'submitting', 'submitted')"),
+            sqlite_where=text("batch_status IN ('queued', 'submitting', 'submitted')"),
+        ),
+    )
 
 
 class Report(Base):
@@ -1,34 +1,59 @@
 import asyncio
+import math
 import time
-from collections import defaultdict, deque
+from collections import OrderedDict
 from collections.abc import Callable
 
 from fastapi import HTTPException, Request, status
 
-_WINDOWS: dict[str, deque[float]] = defaultdict(deque)
-_LOCK = asyncio.Lock()
+# key -> (last_refill_monotonic, tokens, full_at_monotonic). A token bucket keeps O(1) state per
+# client; keys are kept in least-recently-used order so eviction can start from the oldest.
+_BUCKETS: OrderedDict[str, tuple[float, float, float]] = OrderedDict()
+_MAX_TRACKED_KEYS = 100_000
+# Striped locks so unrelated clients don't contend on a single process-wide lock.
+_STRIPE_COUNT = 64
+_STRIPES = [asyncio.Lock() for _ in range(_STRIPE_COUNT)]
+
+
+def _evict_full_buckets(now: float) -> None:
+    # A bucket that has refilled is indistinguishable from a new one, so dropping it changes no
+    # client's limit. Partly drained buckets are kept, even if the map briefly exceeds the cap.
+    while _BUCKETS:
+        key, (_, _, full_at) = next(iter(_BUCKETS.items()))
+        if full_at > now:
+            break
+        del _BUCKETS[key]
 
 
 def rate_limit(*, key_prefix: str, limit: int, window_seconds: int) -> Callable:
+    refill_per_second = limit / window_seconds
+
     async def _limiter(request: Request) -> None:
         client_ip = request.client.host if request.client else "unknown"
         key = f"{key_prefix}:{client_ip}"
-        now = time.time()
-        cutoff = now - window_seconds
-
-        async with _LOCK:
-            bucket = _WINDOWS[key]
-            while bucket and bucket[0] < cutoff:
-                bucket.popleft()
-
-            if len(bucket) >= limit:
-                retry_after = int(max(1, window_seconds - (now - bucket[0])))
+        now = time.monotonic()
+
+        async with _STRIPES[hash(key) % _STRIPE_COUNT]:
+            bucket = _BUCKETS.get(key)
+            if bucket is None:
+                if len(_BUCKETS) >= _MAX_TRACKED_KEYS:
+                    _evict_full_buckets(now)
+                tokens = float(limit)
+            else:
+                last_refill, tokens, _ = bucket
+                tokens = min(float(limit), tokens + (now - last_refill) * refill_per_second)
+                _BUCKETS.move_to_end(key)
+
+            if tokens < 1:
+                _BUCKETS[key] = (now, tokens, now + (limit - tokens) / refill_per_second)
+                retry_after = max(1, math.ceil((1 - tokens) / refill_per_second))
                 raise HTTPException(
                     status_code=status.HTTP_429_TOO_MANY_REQUESTS,
                     detail="Rate limit exceeded.",
                     headers={"Retry-After": str(retry_after)},
                 )
 
-            bucket.append(now)
+            tokens -= 1
+            _BUCKETS[key] = (now, tokens, now + (limit - tokens) / refill_per_second)
 
     return _limiter
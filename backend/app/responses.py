@@ -0,0 +1,16 @@
+from typing import Any
+
+import orjson
+from fastapi.responses import JSONResponse
+
+
+class ORJSONResponse(JSONResponse):
+    """JSON response rendered with orjson, for large untyped payloads.
+
+    Routes with a response_model already get FastAPI's Pydantic JSON fast path, so this is
+    only for handlers that return plain dicts. Returning an instance directly also skips
+    jsonable_encoder; orjson handles datetimes and numpy values natively.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
@@ -1,42 +1,154 @@
-import json
+import asyncio
 import time
+from typing import Literal, NamedTuple
 
+import httpx
+import openai
+import orjson
 import pandas as pd
-from fastapi import APIRouter, Depends, HTTPException, Query
-from openai import OpenAI
-from sqlalchemy import select
-from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from fastapi.responses import StreamingResponse
+from openai import AsyncOpenAI
+from sqlalchemy import select, text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from tenacity import retry, retry_if_exception_type, stop_after_attempt, stop_after_delay, wait_exponential
 
 from app.auth import RequestContext, get_request_context
 from app.config import get_settings
-from app.database import get_db
+from app.database import get_db, get_session_factory
 from app.models import AIQuery, DataRow, Dataset
 from app.rate_limit import rate_limit
+from app.responses import ORJSONResponse
 from app.schemas import AIQueryRequest, AIQueryResponse, AISummaryRequest, AISummaryResponse
+from app.services.ai_batch_service import BATCH_STATUS_QUEUED, build_batch_request_body
+from app.services.ai_service import HAS_OPENAI_API_KEY, AIService, get_ai_service
 from app.services.analytics_service import build_analyst_insights, build_nlq_insight
 from app.services.events_service import track_event
+from app.services.insights_cache import get_cached_insights, store_insights
+from app.services.llm_cache import llm_cache
 from app.services.plan_service import enforce_ai_query_limit
+from app.services.query_list_cache import (
+    get_cached_query_list,
+    invalidate_tenant_query_list,
+    store_query_list,
+)
 
 router = APIRouter(prefix="/ai", tags=["AI Assistant"])
 settings = get_settings()
 
 _openai_api_key = settings.openai_api_key
 _model_name = settings.openai_model
+_SCAN_TIMEOUT_STMT = (
+    text(f"SET LOCAL statement_timeout = {int(settings.ai_scan_statement_timeout_ms)}")
+    if settings.database_url.startswith("postgresql")
+    else None
+)
+_SCAN_TIMEOUT_RESET_STMT = (
+    text("SET LOCAL statement_timeout = DEFAULT") if _SCAN_TIMEOUT_STMT is not None else None
+)
+
+_ANALYSIS_WINDOW_ROWS = 2500
+
+_QUERY_TEMPERATURE = 0.2
+_QUERY_MAX_TOKENS = 700
+
+# One shared async client per process so LLM calls reuse pooled connections and never block the loop.
+client = (
+    AsyncOpenAI(
+        api_key=_openai_api_key,
+        # Retries are owned by _call_llm so attempts and backoff aren't multiplied by the SDK's own.
+        max_retries=0,
+        http_client=httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=50),
+            timeout=httpx.Timeout(60.0, connect=5.0),
+        ),
+    )
+    if HAS_OPENAI_API_KEY
+    else None
+)
+
+
+async def close_openai_client() -> None:
+    if client is not None:
+        await client.close()
+
+
+# Only transient failures are retried; anything else goes straight to the fallback answer.
+# APITimeoutError subclasses APIConnectionError; it is listed so timeouts are visibly retried.
+_RETRYABLE_LLM_ERRORS = (openai.RateLimitError, openai.APIConnectionError, openai.APITimeoutError)
+
+
+@retry(
+    stop=stop_after_attempt(4) | stop_after_delay(30),
+    wait=wait_exponential(multiplier=1, min=1, max=8),
+    retry=retry_if_exception_type(_RETRYABLE_LLM_ERRORS),
+    reraise=True,
+)
+async def _call_llm(messages: list[dict[str, str]], *, stream: bool = False):
+    return await client.chat.completions.create(
+        model=_model_name,
+        messages=messages,
+        temperature=_QUERY_TEMPERATURE,
+        max_tokens=_QUERY_MAX_TOKENS,
+        stream=stream,
+    )
+
+
+async def _fetch_dataset(db: AsyncSession, *, tenant_id: int, dataset_id: int) -> Dataset | None:
+    result = await db.execute(
+        select(Dataset).where(
+            Dataset.id == dataset_id,
+            Dataset.tenant_id == tenant_id,
+        )
+    )
+    return result.scalar_one_or_none()
 
-PLACEHOLDER_OPENAI_KEYS = {
-    "",
-    "your-openai-api-key-here",
-    "your_openai_api_key_here",
-}
 
+async def _fetch_row_window(db: AsyncSession, *, tenant_id: int, dataset_id: int) -> list[dict]:
+    """Fetch the first _ANALYSIS_WINDOW_ROWS rows of a dataset, in order.
 
-def _is_placeholder_api_key(value: str | None) -> bool:
-    if not value:
-        return True
-    return value.strip().lower() in PLACEHOLDER_OPENAI_KEYS
+    Runs on the request's own session as one index range scan on ix_data_rows_tenant_ds_id,
+    so the reads share the connection the request already holds instead of taking more.
+    """
+    stmt = (
+        select(DataRow.row_data)
+        .where(DataRow.tenant_id == tenant_id, DataRow.dataset_id == dataset_id)
+        .order_by(DataRow.id)
+        .limit(_ANALYSIS_WINDOW_ROWS)
+    )
+    if _SCAN_TIMEOUT_STMT is not None:
+        await db.execute(_SCAN_TIMEOUT_STMT)
+    try:
+        result = await db.execute(stmt)
+    except DBAPIError as exc:
+        if "statement timeout" in str(exc.orig):
+            raise HTTPException(status_code=503, detail="Dataset scan timed out. Please retry.") from exc
+        raise
+    if _SCAN_TIMEOUT_RESET_STMT is not None:
+        # The request's transaction continues after the scan; give its later statements the default.
+        await db.execute(_SCAN_TIMEOUT_RESET_STMT)
+    # ScalarResult.all() already returns a fresh list; don't copy 2500 row dicts again.
+    return result.scalars().all()
+
+
+def _build_insights_from_rows(rows: list[dict]) -> dict:
+    return build_analyst_insights(pd.DataFrame.from_records(rows))
+
+
+def _analyze_query_rows(rows: list[dict], prompt: str, cached_insights: dict | None) -> tuple[dict, dict]:
+    analysis_df = pd.DataFrame.from_records(rows)
+    analyst_insights = cached_insights if cached_insights is not None else build_analyst_insights(analysis_df)
+    return analyst_insights, build_nlq_insight(analysis_df, prompt, analyst_insights)
 
 
-client = None if _is_placeholder_api_key(_openai_api_key) else OpenAI(api_key=_openai_api_key)
+async def _analyst_insights_for(dataset: Dataset, rows: list[dict]) -> dict:
+    insights = get_cached_insights(dataset)
+    if insights is None:
+        # pandas work is CPU-bound; keep it off the event loop.
+        insights = await asyncio.to_thread(_build_insights_from_rows, rows)
+        store_insights(dataset, insights)
+    return insights
 
 
 def _build_fallback_response(
@@ -114,134 +226,147 @@ def _build_trust_metadata(
     }
 
 
-@router.post("/query", response_model=AIQueryResponse)
-async def generate_ai_query(
+_MAX_PROMPT_COLUMNS = 20
+_MAX_PROMPT_SUMMARY_CHARS = 500
+
+
+def _prompt_columns(schema: dict, prompt: str) -> list[str]:
+    # Columns named in the question come first so they survive the cap on wide datasets.
+    lowered = prompt.lower()
+    columns = list(schema)
+    mentioned = [col for col in columns if str(col).lower() in lowered]
+    rest = [col for col in columns if col not in mentioned]
+    return (mentioned + rest)[:_MAX_PROMPT_COLUMNS]
+
+
+def _build_llm_context(*, dataset: Dataset, analyst_insights: dict, sample_data: list[dict], prompt: str) -> dict:
+    schema = dataset.schema_info or {}
+    if schema:
+        columns = _prompt_columns(schema, prompt)
+    else:
+        columns = list(sample_data[0])[:_MAX_PROMPT_COLUMNS] if sample_data else []
+    summary = analyst_insights.get("executive_summary")
+    llm_context = {
+        "row_count": dataset.row_count,
+        "schema": {col: schema[col] for col in columns if col in schema},
+        "analyst_summary": summary[:_MAX_PROMPT_SUMMARY_CHARS] if isinstance(summary, str) else summary,
+        "data_quality": analyst_insights.get("data_quality"),
+        "top_correlations": analyst_insights.get("top_correlations", [])[:3],
+        "trend": analyst_insights.get("trend"),
+        "kpis": analyst_insights.get("kpis"),
+        "sample_rows": [{col: row.get(col) for col in columns} for row in sample_data[:5]],
+    }
+    # Every token in the prompt is billed and delays the first streamed token, so skip empty keys.
+    return {key: value for key, value in llm_context.items() if value not in (None, [], {})}
+
+
+def _build_query_messages(llm_context: dict, prompt: str) -> list[dict[str, str]]:
+    # Minified: indentation is pure token overhead for the model.
+    context_json = orjson.dumps(llm_context, default=str, option=orjson.OPT_SERIALIZE_NUMPY).decode()
+    return [
+        {
+            "role": "system",
+            "content": (
+                "You are a senior data analyst. Use only the provided dataset context, "
+                "do not invent numbers, and provide practical business recommendations."
+            ),
+        },
+        {
+            "role": "user",
+            "content": (
+                f"Dataset analysis context:\n{context_json}\n\n"
+                f"Question: {prompt}\n\n"
+                "Respond in Markdown with these sections:\n"
+                "1) Direct Answer\n"
+                "2) Evidence from Data\n"
+                "3) Risks or Caveats\n"
+                "4) Recommended Next Actions"
+            ),
+        },
+    ]
+
+
+class _QueryAnalysis(NamedTuple):
+    dataset: Dataset
+    sample_data: list[dict]
+    analyst_insights: dict
+    nlq_insight: dict
+    trust_metadata: dict
+
+
+async def _prepare_query_analysis(
+    *,
     request: AIQueryRequest,
-    _: None = Depends(rate_limit(key_prefix="ai-query", limit=30, window_seconds=60)),
-    context: RequestContext = Depends(get_request_context),
-    db: AsyncSession = Depends(get_db),
-):
-    """Generate and execute AI-powered data analysis."""
+    context: RequestContext,
+    db: AsyncSession,
+) -> _QueryAnalysis:
     await enforce_ai_query_limit(
         db,
         tenant_id=context.tenant_id,
         user_id=context.user_id,
     )
 
-    start_time = time.time()
-
-    result = await db.execute(
-        select(Dataset).where(
-            Dataset.id == request.dataset_id,
-            Dataset.tenant_id == context.tenant_id,
-        )
-    )
-    dataset = result.scalar_one_or_none()
+    dataset = await _fetch_dataset(db, tenant_id=context.tenant_id, dataset_id=request.dataset_id)
     if not dataset:
         raise HTTPException(status_code=404, detail="Dataset not found")
 
-    sample_result = await db.execute(
-        select(DataRow)
-        .where(
-            DataRow.tenant_id == context.tenant_id,
-            DataRow.dataset_id == request.dataset_id,
-        )
-        .limit(10)
-    )
-    sample_data = [row.row_data for row in sample_result.scalars().all()]
+    analysis_rows = await _fetch_row_window(db, tenant_id=context.tenant_id, dataset_id=request.dataset_id)
 
-    analysis_result = await db.execute(
-        select(DataRow)
-        .where(
-            DataRow.tenant_id == context.tenant_id,
-            DataRow.dataset_id == request.dataset_id,
-        )
-        .limit(2500)
+    # The LLM sample is just the first rows of the analysis window; no separate query needed.
+    sample_data = analysis_rows[:10]
+    cached_insights = get_cached_insights(dataset)
+    analyst_insights, nlq_insight = await asyncio.to_thread(
+        _analyze_query_rows, analysis_rows, request.prompt, cached_insights
     )
-    analysis_rows = [row.row_data for row in analysis_result.scalars().all()]
-    analysis_df = pd.DataFrame(analysis_rows)
-    analyst_insights = build_analyst_insights(analysis_df)
-    nlq_insight = build_nlq_insight(analysis_df, request.prompt, analyst_insights)
+    if cached_insights is None:
+        store_insights(dataset, analyst_insights)
     trust_metadata = _build_trust_metadata(
         dataset=dataset,
         analyst_insights=analyst_insights,
         sample_data=sample_data,
         llm_used=client is not None,
     )
+    return _QueryAnalysis(dataset, sample_data, analyst_insights, nlq_insight, trust_metadata)
 
-    if client is None:
-        generated_code, result_data = _build_fallback_response(
-            request.prompt,
-            sample_data,
-            "missing_or_placeholder_api_key",
-            analyst_insights=analyst_insights,
-        )
-        result_data["nlq"] = nlq_insight
-        result_data["trust"] = trust_metadata
-        generated_code = nlq_insight.get("answer") or generated_code
-    else:
-        try:
-            llm_context = {
-                "row_count": dataset.row_count,
-                "schema": dataset.schema_info,
-                "analyst_summary": analyst_insights.get("executive_summary"),
-                "data_quality": analyst_insights.get("data_quality"),
-                "top_correlations": analyst_insights.get("top_correlations", [])[:3],
-                "trend": analyst_insights.get("trend"),
-                "kpis": analyst_insights.get("kpis"),
-                "sample_rows": sample_data[:5],
-            }
-            response = client.chat.completions.create(
-                model=_model_name,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": (
-                            "You are a senior data analyst. Use only the provided dataset context, "
-                            "do not invent numbers, and provide practical business recommendations."
-                        ),
-                    },
-                    {
-                        "role": "user",
-                        "content": (
-                            f"Dataset analysis context:\n{json.dumps(llm_context, indent=2, default=str)}\n\n"
-                            f"Question: {request.prompt}\n\n"
-                            "Respond in Markdown with these sections:\n"
-                            "1) Direct Answer\n"
-                            "2) Evidence from Data\n"
-                            "3) Risks or Caveats\n"
-                            "4) Recommended Next Actions"
-                        ),
-                    },
-                ],
-                temperature=0.2,
-                max_tokens=700,
-            )
-            generated_code = response.choices[0].message.content or "No response returned from model."
-            result_data = {
-                "generated": True,
-                "analyst_insights": analyst_insights,
-                "nlq": nlq_insight,
-                "trust": trust_metadata,
-            }
-            if nlq_insight.get("answer"):
-                generated_code = (
-                    f"{nlq_insight['answer']}\n\n"
-                    f"{generated_code}"
-                )
-        except Exception as exc:
-            generated_code, result_data = _build_fallback_response(
-                request.prompt,
-                sample_data,
-                f"openai_error: {str(exc)}",
-                analyst_insights=analyst_insights,
-            )
-            result_data["nlq"] = nlq_insight
-            result_data["trust"] = trust_metadata
-            generated_code = nlq_insight.get("answer") or generated_code
 
-    execution_time = int((time.time() - start_time) * 1000)
+def _fallback_query_result(analysis: _QueryAnalysis, prompt: str, reason: str) -> tuple[str, dict]:
+    generated_code, result_data = _build_fallback_response(
+        prompt,
+        analysis.sample_data,
+        reason,
+        analyst_insights=analysis.analyst_insights,
+    )
+    result_data["nlq"] = analysis.nlq_insight
+    result_data["trust"] = analysis.trust_metadata
+    return analysis.nlq_insight.get("answer") or generated_code, result_data
+
+
+def _llm_query_result(analysis: _QueryAnalysis, content: str | None) -> tuple[str, dict]:
+    generated_code = content or "No response returned from model."
+    nlq_answer = analysis.nlq_insight.get("answer")
+    if nlq_answer:
+        generated_code = f"{nlq_answer}\n\n{generated_code}"
+    result_data = {
+        "generated": True,
+        "analyst_insights": analysis.analyst_insights,
+        "nlq": analysis.nlq_insight,
+        "trust": analysis.trust_metadata,
+    }
+    return generated_code, result_data
+
 
+async def _persist_ai_query(
+    db: AsyncSession,
+    *,
+    context: RequestContext,
+    request: AIQueryRequest,
+    analysis: _QueryAnalysis,
+    generated_code: str | None,
+    result_data: dict,
+    execution_time: int,
+    event_name: str,
+    batch_request: dict | None = None,
+) -> AIQuery:
     ai_query = AIQuery(
         tenant_id=context.tenant_id,
         user_id=context.user_id,
@@ -250,22 +375,119 @@ async def generate_ai_query(
         generated_code=generated_code,
         result_data=result_data,
         execution_time_ms=execution_time,
+        batch_status=BATCH_STATUS_QUEUED if batch_request is not None else None,
+        batch_request=batch_request,
     )
     db.add(ai_query)
     await db.commit()
     await db.refresh(ai_query)
+    invalidate_tenant_query_list(context.tenant_id)
     await track_event(
         db,
         context=context,
-        event_name="ai_query_executed",
+        event_name=event_name,
         payload={
             "dataset_id": request.dataset_id,
             "execution_time_ms": execution_time,
             "used_llm": client is not None,
-            "confidence_score": trust_metadata.get("confidence_score"),
+            "confidence_score": analysis.trust_metadata.get("confidence_score"),
         },
     )
     await db.commit()
+    return ai_query
+
+
+@router.post("/query", response_model=AIQueryResponse)
+async def generate_ai_query(
+    request: AIQueryRequest,
+    response: Response,
+    mode: Literal["interactive", "batch"] = Query(
+        default="interactive",
+        description="'batch' queues the LLM call through the OpenAI Batch API and returns 202 immediately.",
+    ),
+    _: None = Depends(rate_limit(key_prefix="ai-query", limit=30, window_seconds=60)),
+    context: RequestContext = Depends(get_request_context),
+    db: AsyncSession = Depends(get_db),
+):
+    """Generate and execute AI-powered data analysis."""
+    if mode == "batch" and client is None:
+        raise HTTPException(status_code=503, detail="Batch mode requires a configured OpenAI API key.")
+
+    start_time = time.time()
+    analysis = await _prepare_query_analysis(
+        request=request,
+        context=context,
+        db=db,
+    )
+
+    if mode == "batch":
+        llm_context = _build_llm_context(
+            dataset=analysis.dataset,
+            analyst_insights=analysis.analyst_insights,
+            sample_data=analysis.sample_data,
+            prompt=request.prompt,
+        )
+        # Persisted without generated_code; the batch worker fills it in once OpenAI finishes.
+        # The request body holds the prompts and dataset context, so it gets its own column
+        # instead of riding along in the client-visible result_data.
+        generated_code = None
+        batch_request = build_batch_request_body(
+            model=_model_name,
+            messages=_build_query_messages(llm_context, request.prompt),
+            temperature=_QUERY_TEMPERATURE,
+            max_tokens=_QUERY_MAX_TOKENS,
+        )
+        result_data = {
+            "generated": False,
+            "analyst_insights": analysis.analyst_insights,
+            "nlq": analysis.nlq_insight,
+            "trust": analysis.trust_metadata,
+            "batch": {"status": BATCH_STATUS_QUEUED},
+        }
+    elif client is None:
+        generated_code, result_data = _fallback_query_result(
+            analysis, request.prompt, "missing_or_placeholder_api_key"
+        )
+    else:
+        try:
+            llm_context = _build_llm_context(
+                dataset=analysis.dataset,
+                analyst_insights=analysis.analyst_insights,
+                sample_data=analysis.sample_data,
+                prompt=request.prompt,
+            )
+            messages = _build_query_messages(llm_context, request.prompt)
+            cache_key = None
+            content = None
+            if llm_cache.is_cacheable(_QUERY_TEMPERATURE):
+                cache_key = llm_cache.cache_key(_model_name, messages, _QUERY_TEMPERATURE)
+                content = llm_cache.get(cache_key)
+            if content is None:
+                completion = await _call_llm(messages)
+                content = completion.choices[0].message.content
+                if content and cache_key:
+                    llm_cache.set(cache_key, content)
+            generated_code, result_data = _llm_query_result(analysis, content)
+        except Exception as exc:
+            generated_code, result_data = _fallback_query_result(
+                analysis, request.prompt, f"openai_error: {str(exc)}"
+            )
+
+    execution_time = int((time.time() - start_time) * 1000)
+    ai_query = await _persist_ai_query(
+        db,
+        context=context,
+        request=request,
+        analysis=analysis,
+        generated_code=generated_code,
+        result_data=result_data,
+        execution_time=execution_time,
+        event_name="ai_query_batched" if mode == "batch" else "ai_query_executed",
+        batch_request=batch_request if mode == "batch" else None,
+    )
+
+    if mode == "batch":
+        response.status_code = status.HTTP_202_ACCEPTED
 
     return AIQueryResponse(
         id=ai_query.id,
@@ -276,34 +498,134 @@ async def generate_ai_query(
     )
 
 
-@router.get("/queries")
+def _sse_event(payload: dict, event: str | None = None) -> str:
+    data = orjson.dumps(payload, default=str, option=orjson.OPT_SERIALIZE_NUMPY).decode()
+    return f"event: {event}\ndata: {data}\n\n" if event else f"data: {data}\n\n"
+
+
+@router.post("/query/stream")
+async def stream_ai_query(
+    request: AIQueryRequest,
+    _: None = Depends(rate_limit(key_prefix="ai-query", limit=30, window_seconds=60)),
+    context: RequestContext = Depends(get_request_context),
+    db: AsyncSession = Depends(get_db),
+    session_factory: async_sessionmaker[AsyncSession] = Depends(get_session_factory),
+):
+    """Stream an AI analysis answer as server-sent events.
+
+    Emits ``{"delta": ...}`` messages as text arrives, then a ``done`` event carrying the
+    persisted query (same shape as ``/ai/query``), whose ``generated_code`` is authoritative.
+    """
+    start_time = time.time()
+    analysis = await _prepare_query_analysis(
+        request=request,
+        context=context,
+        db=db,
+    )
+
+    async def _events():
+        if client is None:
+            generated_code, result_data = _fallback_query_result(
+                analysis, request.prompt, "missing_or_placeholder_api_key"
+            )
+            yield _sse_event({"delta": generated_code})
+        else:
+            nlq_answer = analysis.nlq_insight.get("answer")
+            if nlq_answer:
+                yield _sse_event({"delta": f"{nlq_answer}\n\n"})
+            try:
+                llm_context = _build_llm_context(
+                    dataset=analysis.dataset,
+                    analyst_insights=analysis.analyst_insights,
+                    sample_data=analysis.sample_data,
+                    prompt=request.prompt,
+                )
+                messages = _build_query_messages(llm_context, request.prompt)
+                cache_key = None
+                content = None
+                if llm_cache.is_cacheable(_QUERY_TEMPERATURE):
+                    cache_key = llm_cache.cache_key(_model_name, messages, _QUERY_TEMPERATURE)
+                    content = llm_cache.get(cache_key)
+                if content is not None:
+                    yield _sse_event({"delta": content})
+                else:
+                    parts: list[str] = []
+                    stream = await _call_llm(messages, stream=True)
+                    async for chunk in stream:
+                        delta = chunk.choices[0].delta.content if chunk.choices else None
+                        if delta:
+                            parts.append(delta)
+                            yield _sse_event({"delta": delta})
+                    content = "".join(parts)
+                    if content and cache_key:
+                        llm_cache.set(cache_key, content)
+                generated_code, result_data = _llm_query_result(analysis, content)
+            except Exception as exc:
+                generated_code, result_data = _fallback_query_result(
+                    analysis, request.prompt, f"openai_error: {str(exc)}"
+                )
+
+        execution_time = int((time.time() - start_time) * 1000)
+        # The request-scoped session may already be closed once the body starts streaming.
+        async with session_factory() as session:
+            ai_query = await _persist_ai_query(
+                session,
+                context=context,
+                request=request,
+                analysis=analysis,
+                generated_code=generated_code,
+                result_data=result_data,
+                execution_time=execution_time,
+                event_name="ai_query_executed",
+            )
+        done = AIQueryResponse(
+            id=ai_query.id,
+            prompt=ai_query.prompt,
+            generated_code=ai_query.generated_code,
+            result_data=ai_query.result_data,
+            execution_time_ms=ai_query.execution_time_ms,
+        )
+        yield _sse_event(done.model_dump(), event="done")
+
+    return StreamingResponse(
+        _events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+def _serialize_query(query: AIQuery) -> dict:
+    return {
+        "id": query.id,
+        "dataset_id": query.dataset_id,
+        "prompt": query.prompt,
+        "generated_code": query.generated_code,
+        "result_data": query.result_data,
+        "execution_time_ms": query.execution_time_ms,
+        "created_at": query.created_at,
+    }
+
+
+@router.get("/queries", response_class=ORJSONResponse)
 async def list_queries(
     limit: int = Query(default=10, ge=1, le=100),
     context: RequestContext = Depends(get_request_context),
     db: AsyncSession = Depends(get_db),
 ):
     """List recent AI queries."""
+    cached = get_cached_query_list(context.tenant_id, limit)
+    if cached is not None:
+        return Response(content=cached, media_type="application/json")
+
     result = await db.execute(
         select(AIQuery)
         .where(AIQuery.tenant_id == context.tenant_id)
         .order_by(AIQuery.created_at.desc())
         .limit(limit)
     )
-    queries = result.scalars().all()
-    return {
-        "queries": [
-            {
-                "id": query.id,
-                "dataset_id": query.dataset_id,
-                "prompt": query.prompt,
-                "generated_code": query.generated_code,
-                "result_data": query.result_data,
-                "execution_time_ms": query.execution_time_ms,
-                "created_at": query.created_at,
-            }
-            for query in queries
-        ]
-    }
+    response = ORJSONResponse({"queries": [_serialize_query(query) for query in result.scalars().all()]})
+    store_query_list(context.tenant_id, limit, response.body)
+    return response
 
 
 @router.post("/summarize", response_model=AISummaryResponse)
@@ -312,37 +634,37 @@ async def summarize_dataset(
     _: None = Depends(rate_limit(key_prefix="ai-summarize", limit=20, window_seconds=60)),
     context: RequestContext = Depends(get_request_context),
     db: AsyncSession = Depends(get_db),
+    ai_service: AIService = Depends(get_ai_service),
 ):
     """Generate a summary of the dataset."""
-    result = await db.execute(
-        select(Dataset).where(
-            Dataset.id == request.dataset_id,
-            Dataset.tenant_id == context.tenant_id,
-        )
+    row_filter = (
+        DataRow.tenant_id == context.tenant_id,
+        DataRow.dataset_id == request.dataset_id,
     )
-    dataset = result.scalar_one_or_none()
+    # The summary prompt only needs a handful of sample rows; the full analysis window is
+    # fetched below only when cached insights for this dataset version are unavailable.
+    dataset = await _fetch_dataset(db, tenant_id=context.tenant_id, dataset_id=request.dataset_id)
     if not dataset:
         raise HTTPException(status_code=404, detail="Dataset not found")
 
-    data_result = await db.execute(
-        select(DataRow)
-        .where(
-            DataRow.tenant_id == context.tenant_id,
-            DataRow.dataset_id == request.dataset_id,
-        )
-        .limit(2500)
-    )
-    rows = data_result.scalars().all()
-    if not rows:
+    row_result = await db.execute(select(DataRow.row_data).where(*row_filter).order_by(DataRow.id).limit(5))
+    row_data = row_result.scalars().all()
+
+    if not row_data:
         return AISummaryResponse(
             summary="This dataset is empty. Upload data to get a summary.",
             key_insights=[],
         )
 
-    row_data = [r.row_data for r in rows]
-    df = pd.DataFrame(row_data)
+    analyst_insights = get_cached_insights(dataset)
+    if analyst_insights is None:
+        analysis_rows = await _fetch_row_window(
+            db,
+            tenant_id=context.tenant_id,
+            dataset_id=request.dataset_id,
+        )
+        analyst_insights = await _analyst_insights_for(dataset, analysis_rows)
 
-    analyst_insights = build_analyst_insights(df)
     numeric_stats: dict[str, dict[str, float]] = {
         profile["column"]: {
             "min": float(profile.get("min", 0.0)),
@@ -352,11 +674,9 @@ async def summarize_dataset(
         for profile in analyst_insights.get("numeric_profiles", [])
     }
 
-    from app.services.ai_service import ai_service
-
-    ai_response = ai_service.summarize_dataset(
+    ai_response = await ai_service.summarize_dataset(
         row_count=dataset.row_count,
-        columns=list(dataset.schema_info.keys()) if dataset.schema_info else df.columns.tolist(),
+        columns=list(dataset.schema_info.keys()) if dataset.schema_info else list(row_data[0].keys()),
         sample_data=row_data,
         numeric_stats=numeric_stats,
     )
@@ -388,29 +708,16 @@ async def recommended_questions(
     db: AsyncSession = Depends(get_db),
 ):
     """Return analyst-grade starter questions tailored to the dataset."""
-    result = await db.execute(
-        select(Dataset).where(
-            Dataset.id == dataset_id,
-            Dataset.tenant_id == context.tenant_id,
-        )
-    )
-    dataset = result.scalar_one_or_none()
+    dataset = await _fetch_dataset(db, tenant_id=context.tenant_id, dataset_id=dataset_id)
     if not dataset:
         raise HTTPException(status_code=404, detail="Dataset not found")
 
-    rows_result = await db.execute(
-        select(DataRow)
-        .where(
-            DataRow.tenant_id == context.tenant_id,
-            DataRow.dataset_id == dataset_id,
-        )
-        .limit(2500)
-    )
-    rows = [row.row_data for row in rows_result.scalars().all()]
+    rows = await _fetch_row_window(db, tenant_id=context.tenant_id, dataset_id=dataset_id)
+
     if not rows:
         return {"dataset_id": dataset_id, "questions": []}
 
-    insights = build_analyst_insights(pd.DataFrame(rows))
+    insights = await _analyst_insights_for(dataset, rows)
     questions = [
         "Which metric should leadership monitor weekly and why?",
         "Where are the biggest risks in data quality and how do they affect decisions?",
@@ -1,10 +1,11 @@
+import asyncio
 import re
 
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.auth import get_current_user
+from app.auth import get_current_user, invalidate_cached_user
 from app.database import get_db
 from app.models import Tenant, User
 from app.schemas import (
@@ -13,7 +14,7 @@ from app.schemas import (
     AuthTokenResponse,
     AuthUser,
 )
-from app.security import create_access_token, get_password_hash, verify_password
+from app.security import create_access_token, get_password_hash, verify_and_update_password
 
 router = APIRouter(prefix="/auth", tags=["Authentication"])
 
@@ -77,7 +78,8 @@ async def signup(
         tenant_id=tenant.id,
         email=email,
         full_name=(payload.full_name or "").strip() or None,
-        hashed_password=get_password_hash(payload.password),
+        # argon2 is deliberately expensive; hash off the event loop.
+        hashed_password=await asyncio.to_thread(get_password_hash, payload.password),
         role="admin",
         is_active=True,
     )
@@ -101,8 +103,15 @@ async def signin(
         raise HTTPException(status_code=401, detail="Invalid email or password.")
     if not user.is_active:
         raise HTTPException(status_code=403, detail="Account is inactive.")
-    if not verify_password(payload.password, user.hashed_password):
+    verified, new_hash = await asyncio.to_thread(
+        verify_and_update_password, payload.password, user.hashed_password
+    )
+    if not verified:
         raise HTTPException(status_code=401, detail="Invalid email or password.")
+    if new_hash:
+        user.hashed_password = new_hash
+        await db.commit()
+        invalidate_cached_user(user.id)
 
     return _build_auth_response(user)
 
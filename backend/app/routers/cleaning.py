@@ -4,7 +4,7 @@ from datetime import datetime
 
 import pandas as pd
 from fastapi import APIRouter, Depends, HTTPException, Query, status
-from sqlalchemy import insert, select
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.auth import RequestContext, get_request_context
@@ -26,6 +26,7 @@ from app.services.cleaning_service import (
     build_cleaning_profile,
     dataframe_to_json_records,
 )
+from app.services.data_rows_service import insert_data_rows
 from app.services.events_service import track_event
 
 router = APIRouter(prefix="/cleaning", tags=["Data Cleaning"])
@@ -48,14 +49,14 @@ async def _load_dataset_df(
         raise HTTPException(status_code=404, detail="Dataset not found")
 
     rows_result = await db.execute(
-        select(DataRow)
+        select(DataRow.row_data)
         .where(
             DataRow.tenant_id == context.tenant_id,
             DataRow.dataset_id == dataset_id,
         )
         .order_by(DataRow.id.asc())
     )
-    rows = [row.row_data for row in rows_result.scalars().all()]
+    rows = rows_result.scalars().all()
     if not rows:
         if dataset.schema_info:
             return dataset, pd.DataFrame(columns=list(dataset.schema_info.keys()))
@@ -73,7 +74,7 @@ async def _create_dataset_from_dataframe(
     context: RequestContext,
     db: AsyncSession,
 ) -> Dataset:
-    schema_info = {str(col): str(df[col].dtype) for col in df.columns}
+    schema_info = df.dtypes.astype(str).rename(index=str).to_dict()
     new_dataset = Dataset(
         tenant_id=context.tenant_id,
         user_id=context.user_id,
@@ -86,17 +87,12 @@ async def _create_dataset_from_dataframe(
     db.add(new_dataset)
     await db.flush()
 
-    records = dataframe_to_json_records(df)
-    if records:
-        rows_to_insert = [
-            {
-                "tenant_id": context.tenant_id,
-                "dataset_id": new_dataset.id,
-                "row_data": row,
-            }
-            for row in records
-        ]
-        await db.execute(insert(DataRow), rows_to_insert)
+    await insert_data_rows(
+        db,
+        tenant_id=context.tenant_id,
+        dataset_id=new_dataset.id,
+        records=dataframe_to_json_records(df),
+    )
 
     return new_dataset
 
@@ -1,27 +1,49 @@
-from io import StringIO
+import asyncio
+import codecs
+import tempfile
+from collections.abc import AsyncIterator
+from typing import IO
 
+import numpy as np
+import orjson
 import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pacsv
 from fastapi import APIRouter, Depends, File, HTTPException, Query, UploadFile, status
-from sqlalchemy import delete, insert, select
-from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi.responses import StreamingResponse
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
 from app.config import get_settings
 from app.auth import RequestContext, get_request_context
-from app.database import get_db
+from app.database import get_db, get_session_factory
 from app.models import AIQuery, DataRow, Dataset
 from app.rate_limit import rate_limit
+from app.responses import ORJSONResponse
 from app.schemas import DataUploadResponse, Dataset as DatasetSchema, DatasetCreate
+from app.services.data_rows_service import insert_data_rows
 from app.services.events_service import track_event
+from app.services.insights_cache import invalidate_tenant_insights
 from app.services.plan_service import enforce_row_limit
+from app.services.query_list_cache import invalidate_tenant_query_list
 
 router = APIRouter(prefix="/datasets", tags=["Datasets"])
 settings = get_settings()
 
+_UPLOAD_READ_BLOCK = 1 << 20
+# Same encoding options as ORJSONResponse, applied per row when streaming dataset data.
+_ROW_JSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+_CSV_BLOCK_SIZE = 1 << 20
+
 
 async def _clear_tenant_data(db: AsyncSession, tenant_id: int) -> None:
+    # Children are deleted explicitly rather than relying on ON DELETE CASCADE, which only
+    # databases migrated past 20260301_005 have (create_all does not alter existing constraints).
     await db.execute(delete(AIQuery).where(AIQuery.tenant_id == tenant_id))
     await db.execute(delete(DataRow).where(DataRow.tenant_id == tenant_id))
     await db.execute(delete(Dataset).where(Dataset.tenant_id == tenant_id))
+    invalidate_tenant_insights(tenant_id)
+    invalidate_tenant_query_list(tenant_id)
 
 
 @router.post("/", response_model=DatasetSchema)
@@ -41,7 +63,6 @@ async def create_dataset(
     )
     db.add(new_dataset)
     await db.commit()
-    await db.refresh(new_dataset)
     return new_dataset
 
 
@@ -73,6 +94,160 @@ async def list_datasets(
     return result.scalars().all()
 
 
+def _upload_too_large() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        detail=f"CSV exceeds max upload size ({settings.max_upload_size_bytes} bytes)",
+    )
+
+
+async def _spool_upload(file: UploadFile) -> tuple[IO[bytes], str]:
+    """Copy the upload into a temp file block by block, enforcing the size cap.
+
+    Returns the flushed file and the encoding to parse it with. UTF-8 is validated
+    incrementally as blocks arrive, so the whole file is never held as one str.
+    """
+    spool = tempfile.NamedTemporaryFile(prefix="upload-", suffix=".csv")
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    encoding = "utf-8"
+    size = 0
+    try:
+        while block := await file.read(_UPLOAD_READ_BLOCK):
+            size += len(block)
+            if size > settings.max_upload_size_bytes:
+                raise _upload_too_large()
+            if encoding == "utf-8":
+                try:
+                    decoder.decode(block)
+                except UnicodeDecodeError:
+                    encoding = "latin-1"
+            spool.write(block)
+        if encoding == "utf-8":
+            try:
+                decoder.decode(b"", final=True)
+            except UnicodeDecodeError:
+                encoding = "latin-1"
+        if size == 0:
+            raise HTTPException(status_code=400, detail="File is empty")
+    except BaseException:
+        spool.close()
+        raise
+
+    spool.flush()
+    return spool, encoding
+
+
+def _normalize_column_names(names: list[str]) -> list[str]:
+    # Match pandas: empty headers become "Unnamed: N" and duplicates get the first ".N" suffix
+    # not already used by another incoming header, so no column collapses in the row dicts.
+    names = [name or f"Unnamed: {index}" for index, name in enumerate(names)]
+    taken = set(names)
+    seen: set[str] = set()
+    suffixes: dict[str, int] = {}
+    normalized: list[str] = []
+    for name in names:
+        if name not in seen:
+            seen.add(name)
+            normalized.append(name)
+            continue
+        suffix = suffixes.get(name, 0) + 1
+        while f"{name}.{suffix}" in taken:
+            suffix += 1
+        suffixes[name] = suffix
+        taken.add(f"{name}.{suffix}")
+        normalized.append(f"{name}.{suffix}")
+    return normalized
+
+
+class _ShortRowDetector:
+    """Arrow invalid-row handler that notes rows with missing trailing cells before failing."""
+
+    def __init__(self) -> None:
+        self.found = False
+
+    def __call__(self, row) -> str:
+        if row.actual_columns < row.expected_columns:
+            self.found = True
+        return "error"
+
+
+def _csv_options(
+    encoding: str, short_rows: _ShortRowDetector
+) -> tuple[pacsv.ReadOptions, pacsv.ParseOptions]:
+    return (
+        pacsv.ReadOptions(block_size=_CSV_BLOCK_SIZE, use_threads=True, encoding=encoding),
+        # Quoted cells may span lines (pandas accepts this), so block splitting must respect quotes.
+        pacsv.ParseOptions(newlines_in_values=True, invalid_row_handler=short_rows),
+    )
+
+
+def _temporal_columns(schema: pa.Schema) -> set[str]:
+    return {field.name for field in schema if pa.types.is_temporal(field.type)}
+
+
+def _read_csv_table(
+    path: str, encoding: str, text_columns: set[str], short_rows: _ShortRowDetector
+) -> pa.Table:
+    read_options, parse_options = _csv_options(encoding, short_rows)
+    # Arrow reads straight from the page cache through the mapping, with no copy into Python bytes.
+    with pa.memory_map(path, "r") as source:
+        return pacsv.read_csv(
+            source,
+            read_options=read_options,
+            parse_options=parse_options,
+            # Empty cells become nulls, as pandas' NaN did.
+            convert_options=pacsv.ConvertOptions(
+                strings_can_be_null=True,
+                column_types={name: pa.string() for name in text_columns},
+            ),
+        )
+
+
+def _read_csv_table_arrow(path: str, encoding: str, short_rows: _ShortRowDetector) -> pa.Table:
+    # Arrow infers dates, times and timestamps, which would rewrite the uploaded text
+    # ("2025-01-01 10:00:00" -> "2025-01-01T10:00:00"). Probe the first block's schema and
+    # read those columns as strings, as pandas did.
+    read_options, parse_options = _csv_options(encoding, short_rows)
+    with pa.memory_map(path, "r") as source:
+        probe = pacsv.open_csv(
+            source,
+            read_options=read_options,
+            parse_options=parse_options,
+            convert_options=pacsv.ConvertOptions(strings_can_be_null=True),
+        )
+        text_columns = _temporal_columns(probe.schema)
+        probe.close()
+
+    table = _read_csv_table(path, encoding, text_columns, short_rows)
+    # The full read can still infer a temporal type the first block did not show; re-read once.
+    missed = _temporal_columns(table.schema) - text_columns
+    if missed:
+        table = _read_csv_table(path, encoding, text_columns | missed, short_rows)
+    return table
+
+
+def _parse_csv_table(path: str, encoding: str) -> pa.Table:
+    short_rows = _ShortRowDetector()
+    try:
+        table = _read_csv_table_arrow(path, encoding, short_rows)
+    except pa.ArrowInvalid:
+        if not short_rows.found:
+            raise
+        # Arrow cannot pad short rows (common at the end of Excel exports); pandas fills the
+        # missing cells with NaN, so hand those files to it instead.
+        frame = pd.read_csv(path, encoding=encoding)
+        table = pa.Table.from_pandas(frame, preserve_index=False)
+    return table.rename_columns(_normalize_column_names(table.column_names))
+
+
+def _arrow_dtype_name(arrow_type: pa.DataType) -> str:
+    # Keep schema_info in the pandas dtype vocabulary used by the other dataset sources.
+    try:
+        return str(np.dtype(arrow_type.to_pandas_dtype()))
+    except (NotImplementedError, TypeError):
+        return str(arrow_type)
+
+
 @router.post("/upload", response_model=DataUploadResponse)
 async def upload_new_dataset(
     file: UploadFile = File(...),
@@ -80,7 +255,11 @@ async def upload_new_dataset(
     context: RequestContext = Depends(get_request_context),
     db: AsyncSession = Depends(get_db),
 ):
-    """Upload a CSV file and replace the current tenant dataset (single dataset mode)."""
+    """Upload a CSV file and replace the current tenant dataset (single dataset mode).
+
+    The file is parsed with Arrow's multi-threaded CSV reader into a columnar table, then
+    converted to row dicts and inserted ``upload_chunk_rows`` at a time.
+    """
     if not file.filename or not file.filename.lower().endswith(".csv"):
         raise HTTPException(status_code=400, detail="Only CSV files are supported")
 
@@ -89,80 +268,61 @@ async def upload_new_dataset(
     if raw_size:
         try:
             if int(raw_size) > settings.max_upload_size_bytes:
-                raise HTTPException(
-                    status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
-                    detail=f"CSV exceeds max upload size ({settings.max_upload_size_bytes} bytes)",
-                )
+                raise _upload_too_large()
         except ValueError:
             pass
 
-    try:
-        contents = await file.read()
-        if not contents:
-            raise HTTPException(status_code=400, detail="File is empty")
-        if len(contents) > settings.max_upload_size_bytes:
-            raise HTTPException(
-                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
-                detail=f"CSV exceeds max upload size ({settings.max_upload_size_bytes} bytes)",
-            )
-
+    spool, encoding = await _spool_upload(file)
+    with spool:
         try:
-            decoded = contents.decode("utf-8")
-        except UnicodeDecodeError:
-            decoded = contents.decode("latin-1")
-
-        df = pd.read_csv(StringIO(decoded))
-        if df.empty:
-            raise HTTPException(status_code=400, detail="CSV contains no data")
-    except HTTPException:
-        raise
-    except Exception as exc:
-        raise HTTPException(status_code=400, detail=f"Failed to parse CSV: {str(exc)}")
+            # Arrow parses blocks on its own worker threads; the call itself still blocks, so
+            # keep it off the event loop.
+            table = await asyncio.to_thread(_parse_csv_table, spool.name, encoding)
+        except Exception as exc:
+            raise HTTPException(status_code=400, detail=f"Failed to parse CSV: {str(exc)}")
+
+    row_count = table.num_rows
+    if row_count == 0:
+        raise HTTPException(status_code=400, detail="CSV contains no data")
 
     await enforce_row_limit(
         db,
         tenant_id=context.tenant_id,
         user_id=context.user_id,
-        row_count=int(len(df)),
+        row_count=row_count,
     )
 
     await _clear_tenant_data(db, context.tenant_id)
 
-    schema_info = {col: str(df[col].dtype) for col in df.columns}
     new_dataset = Dataset(
         tenant_id=context.tenant_id,
         user_id=context.user_id,
         name=file.filename,
         description="Uploaded via CSV",
         source_type="csv",
-        schema_info=schema_info,
-        row_count=len(df),
+        schema_info={field.name: _arrow_dtype_name(field.type) for field in table.schema},
+        row_count=row_count,
     )
     db.add(new_dataset)
     await db.flush()
 
-    df = df.where(pd.notnull(df), None)
-    rows_to_insert = [
-        {
-            "tenant_id": context.tenant_id,
-            "dataset_id": new_dataset.id,
-            "row_data": row.to_dict(),
-        }
-        for _, row in df.iterrows()
-    ]
-
-    if rows_to_insert:
-        await db.execute(insert(DataRow), rows_to_insert)
+    # to_pylist() builds the row dicts in C, one bounded batch at a time.
+    for batch in table.to_batches(max_chunksize=settings.upload_chunk_rows):
+        await insert_data_rows(
+            db,
+            tenant_id=context.tenant_id,
+            dataset_id=new_dataset.id,
+            records=batch.to_pylist(),
+        )
 
     await db.commit()
-    await db.refresh(new_dataset)
     await track_event(
         db,
         context=context,
         event_name="dataset_uploaded",
         payload={
             "dataset_id": new_dataset.id,
-            "rows_imported": int(len(df)),
+            "rows_imported": row_count,
             "file_name": file.filename,
         },
     )
@@ -170,8 +330,8 @@ async def upload_new_dataset(
 
     return DataUploadResponse(
         dataset_id=new_dataset.id,
-        rows_imported=len(df),
-        message=f"Successfully uploaded '{file.filename}' with {len(df)} rows.",
+        rows_imported=row_count,
+        message=f"Successfully uploaded '{file.filename}' with {row_count} rows.",
     )
 
 
@@ -181,6 +341,7 @@ async def get_dataset_data(
     limit: int = Query(default=100, ge=1, le=1000),
     context: RequestContext = Depends(get_request_context),
     db: AsyncSession = Depends(get_db),
+    session_factory: async_sessionmaker[AsyncSession] = Depends(get_session_factory),
 ):
     """Get data rows for a dataset."""
     requested_dataset = await db.execute(
@@ -200,18 +361,32 @@ async def get_dataset_data(
         )
         effective_dataset_id = latest_result.scalar_one_or_none()
         if effective_dataset_id is None:
-            return {"data": []}
+            return ORJSONResponse({"data": []})
 
-    result = await db.execute(
-        select(DataRow)
+    stmt = (
+        select(DataRow.row_data)
         .where(
             DataRow.tenant_id == context.tenant_id,
             DataRow.dataset_id == effective_dataset_id,
         )
+        .order_by(DataRow.id)
         .limit(limit)
     )
-    rows = result.scalars().all()
-    return {"data": [row.row_data for row in rows]}
+    return StreamingResponse(_stream_row_data(session_factory, stmt), media_type="application/json")
+
+
+async def _stream_row_data(session_factory: async_sessionmaker[AsyncSession], stmt) -> AsyncIterator[bytes]:
+    # Encode rows one at a time off a server-side cursor so a page of wide rows is never held
+    # as one list plus one rendered body. The stream owns its session: the request's get_db
+    # session may already be closed by the time the body is iterated.
+    async with session_factory() as session:
+        rows = await session.stream_scalars(stmt)
+        yield b'{"data":['
+        first = True
+        async for row_data in rows:
+            yield (b"" if first else b",") + orjson.dumps(row_data, option=_ROW_JSON_OPTIONS)
+            first = False
+        yield b"]}"
 
 
 @router.delete("/clear")
@@ -48,14 +48,12 @@ async def _get_workspace_settings(db: AsyncSession, *, tenant_id: int) -> Worksp
 
 async def _to_dataframe(db: AsyncSession, *, tenant_id: int, dataset_id: int) -> pd.DataFrame:
     rows_result = await db.execute(
-        select(DataRow).where(
+        select(DataRow.row_data).where(
             DataRow.tenant_id == tenant_id,
             DataRow.dataset_id == dataset_id,
         )
     )
-    rows = rows_result.scalars().all()
-    row_data = [row.row_data for row in rows]
-    return pd.DataFrame(row_data)
+    return pd.DataFrame(rows_result.scalars().all())
 
 
 def _report_response(report: Report) -> ReportResponse:
@@ -1,4 +1,6 @@
+import asyncio
 import time
+from collections import OrderedDict
 from datetime import datetime
 
 import pandas as pd
@@ -17,7 +19,95 @@ from app.services.numeric_parsing import prepare_numeric_dataframe
 router = APIRouter(prefix="/overview", tags=["Overview"])
 settings = get_settings()
 
-_overview_cache: dict[int, dict] = {}
+_OVERVIEW_CACHE_MAX_ENTRIES = 50
+# dataset_id -> cached metrics, least recently used first.
+_overview_cache: OrderedDict[int, dict] = OrderedDict()
+
+
+def _empty_analyst_insights(*, summary: str, recommendation: str, note: str) -> dict:
+    return {
+        "executive_summary": summary,
+        "recommendations": [recommendation],
+        "data_quality": {
+            "rows_analyzed": 0,
+            "columns_analyzed": 0,
+            "duplicate_rows": 0,
+            "duplicate_pct": 0.0,
+            "completeness_pct": 0.0,
+            "high_missing_columns": [],
+            "inconsistent_categories": [],
+            "sampled": False,
+        },
+        "numeric_profiles": [],
+        "categorical_profiles": [],
+        "top_correlations": [],
+        "segments": [],
+        "trend": None,
+        "kpis": {},
+        "business_summary": {
+            "profit_available": False,
+            "revenue_column": None,
+            "cost_column": None,
+            "profit_column": None,
+            "total_revenue": None,
+            "total_cost": None,
+            "total_profit": None,
+            "profit_margin_pct": None,
+            "profit_rows": None,
+            "loss_rows": None,
+            "neutral_rows": None,
+            "message": "Upload data to calculate business performance.",
+        },
+        "profit_loss_breakdown": {
+            "segment_column": None,
+            "rows": [],
+            "top_profit_segments": [],
+            "top_loss_segments": [],
+            "message": "No data available for profit/loss breakdown.",
+        },
+        "simplified_trend": None,
+        "chart_explanations": ["Upload data to enable simplified chart explanations."],
+        "key_drivers": {
+            "positive_drivers": [],
+            "negative_drivers": [],
+        },
+        "alerts": [],
+        "precision_audit": {
+            "numeric_columns_used": [],
+            "coerced_numeric_columns": [],
+            "ignored_numeric_columns": [],
+            "coercion_confidence": 1.0,
+            "notes": [note],
+        },
+    }
+
+
+# Empty-state payloads are built once; handlers treat them as read-only and only copy the
+# no-rows variant to stamp in the dataset id and timestamp.
+_EMPTY_NO_DATASET = OverviewMetrics(
+    total_rows=0,
+    total_columns=0,
+    numeric_columns=[],
+    last_updated=None,
+    basic_stats={},
+    analyst_insights=_empty_analyst_insights(
+        summary="No dataset is available yet. Upload a CSV to generate insights.",
+        recommendation="Upload a CSV file to begin analysis.",
+        note="No dataset is loaded yet.",
+    ),
+)
+_EMPTY_NO_ROWS = OverviewMetrics(
+    total_rows=0,
+    total_columns=0,
+    numeric_columns=[],
+    basic_stats={},
+    chart_data=[],
+    analyst_insights=_empty_analyst_insights(
+        summary="Dataset has no rows. Upload non-empty CSV data to generate insights.",
+        recommendation="Upload a CSV with rows to enable analyst insights.",
+        note="Dataset has no rows yet.",
+    ),
+)
 
 
 def _dataset_cache_key(dataset: Dataset) -> str:
@@ -31,9 +121,70 @@ def _cache_metrics(dataset_id: int, cache_key: str, cached_at: float, payload: O
         "cached_at": cached_at,
         "payload": payload,
     }
-    if len(_overview_cache) > 50:
-        oldest_dataset_id = min(_overview_cache.items(), key=lambda item: item[1]["cached_at"])[0]
-        _overview_cache.pop(oldest_dataset_id, None)
+    _overview_cache.move_to_end(dataset_id)
+    while len(_overview_cache) > _OVERVIEW_CACHE_MAX_ENTRIES:
+        _overview_cache.popitem(last=False)
+
+
+def _compute_metrics(rows: list[dict], dataset: Dataset) -> OverviewMetrics:
+    df = pd.DataFrame(rows)
+    prepared_df, numeric_cols, numeric_audit = prepare_numeric_dataframe(df)
+
+    analyst_insights = build_analyst_insights(prepared_df, numeric_audit=numeric_audit)
+
+    # The insight profiles already carry min/max/mean for up to 12 numeric columns; only the
+    # columns beyond that cap need their own aggregate pass.
+    column_stats: dict[str, dict[str, float]] = {
+        profile["column"]: {"min": profile["min"], "max": profile["max"], "avg": profile["mean"]}
+        for profile in analyst_insights.get("numeric_profiles", [])
+    }
+    remaining_cols = [col for col in numeric_cols if col not in column_stats]
+    if remaining_cols:
+        stats = (
+            prepared_df[remaining_cols]
+            .apply(pd.to_numeric, errors="coerce")
+            .agg(["count", "min", "max", "mean"])
+        )
+        for col in stats.columns:
+            if stats.at["count", col] > 0:
+                column_stats[col] = {
+                    "min": float(stats.at["min", col]),
+                    "max": float(stats.at["max", col]),
+                    "avg": float(stats.at["mean", col]),
+                }
+    basic_stats = {col: column_stats[col] for col in numeric_cols if col in column_stats}
+
+    chart_data: list[dict] = []
+    if numeric_cols:
+        label_col = None
+        string_cols = prepared_df.select_dtypes(include=["object", "string"]).columns.tolist()
+        if string_cols:
+            for col in string_cols:
+                if any(token in col.lower() for token in ["name", "date", "product", "month", "category"]):
+                    label_col = col
+                    break
+            if not label_col:
+                label_col = string_cols[0]
+
+        # Ten rows only: build the records straight from column lists, no frame copy.
+        head = prepared_df.head(10)
+        names = (head[label_col].astype(str) if label_col else head.index.astype(str)).tolist()
+        columns = {col: head[col].tolist() for col in numeric_cols}
+        chart_data = [
+            {"name": name, **{col: values[index] for col, values in columns.items()}}
+            for index, name in enumerate(names)
+        ]
+
+    return OverviewMetrics(
+        dataset_id=dataset.id,
+        total_rows=len(df),
+        total_columns=len(df.columns),
+        numeric_columns=numeric_cols,
+        last_updated=dataset.updated_at or datetime.now(),
+        basic_stats=basic_stats,
+        chart_data=chart_data,
+        analyst_insights=analyst_insights,
+    )
 
 
 @router.get("/metrics", response_model=OverviewMetrics)
@@ -51,196 +202,34 @@ async def get_overview_metrics(
     dataset = dataset_result.scalar_one_or_none()
 
     if not dataset:
-        return OverviewMetrics(
-            total_rows=0,
-            total_columns=0,
-            numeric_columns=[],
-            last_updated=None,
-            basic_stats={},
-            analyst_insights={
-                "executive_summary": "No dataset is available yet. Upload a CSV to generate insights.",
-                "recommendations": ["Upload a CSV file to begin analysis."],
-                "data_quality": {
-                    "rows_analyzed": 0,
-                    "columns_analyzed": 0,
-                    "duplicate_rows": 0,
-                    "duplicate_pct": 0.0,
-                    "completeness_pct": 0.0,
-                    "high_missing_columns": [],
-                    "inconsistent_categories": [],
-                },
-                "numeric_profiles": [],
-                "categorical_profiles": [],
-                "top_correlations": [],
-                "segments": [],
-                "trend": None,
-                "kpis": {},
-                "business_summary": {
-                    "profit_available": False,
-                    "revenue_column": None,
-                    "cost_column": None,
-                    "profit_column": None,
-                    "total_revenue": None,
-                    "total_cost": None,
-                    "total_profit": None,
-                    "profit_margin_pct": None,
-                    "profit_rows": None,
-                    "loss_rows": None,
-                    "neutral_rows": None,
-                    "message": "Upload data to calculate business performance.",
-                },
-                "profit_loss_breakdown": {
-                    "segment_column": None,
-                    "rows": [],
-                    "top_profit_segments": [],
-                    "top_loss_segments": [],
-                    "message": "No data available for profit/loss breakdown.",
-                },
-                "simplified_trend": None,
-                "chart_explanations": ["Upload data to enable simplified chart explanations."],
-                "key_drivers": {
-                    "positive_drivers": [],
-                    "negative_drivers": [],
-                },
-                "alerts": [],
-                "precision_audit": {
-                    "numeric_columns_used": [],
-                    "coerced_numeric_columns": [],
-                    "ignored_numeric_columns": [],
-                    "coercion_confidence": 1.0,
-                    "notes": ["No dataset is loaded yet."],
-                },
-            },
-        )
+        return _EMPTY_NO_DATASET
 
     cache_key = _dataset_cache_key(dataset)
     cached = _overview_cache.get(dataset.id)
     now = time.time()
     if cached and cached["cache_key"] == cache_key and (now - cached["cached_at"]) < settings.overview_cache_ttl_seconds:
+        _overview_cache.move_to_end(dataset.id)
         return cached["payload"]
 
     rows_result = await db.execute(
-        select(DataRow).where(
+        select(DataRow.row_data)
+        .where(
             DataRow.tenant_id == context.tenant_id,
             DataRow.dataset_id == dataset.id,
         )
+        .order_by(DataRow.id)
     )
     rows = rows_result.scalars().all()
 
     if not rows:
-        payload = OverviewMetrics(
-            dataset_id=dataset.id,
-            total_rows=0,
-            total_columns=0,
-            numeric_columns=[],
-            last_updated=dataset.updated_at,
-            basic_stats={},
-            chart_data=[],
-            analyst_insights={
-                "executive_summary": "Dataset has no rows. Upload non-empty CSV data to generate insights.",
-                "recommendations": ["Upload a CSV with rows to enable analyst insights."],
-                "data_quality": {
-                    "rows_analyzed": 0,
-                    "columns_analyzed": 0,
-                    "duplicate_rows": 0,
-                    "duplicate_pct": 0.0,
-                    "completeness_pct": 0.0,
-                    "high_missing_columns": [],
-                    "inconsistent_categories": [],
-                },
-                "numeric_profiles": [],
-                "categorical_profiles": [],
-                "top_correlations": [],
-                "segments": [],
-                "trend": None,
-                "kpis": {},
-                "business_summary": {
-                    "profit_available": False,
-                    "revenue_column": None,
-                    "cost_column": None,
-                    "profit_column": None,
-                    "total_revenue": None,
-                    "total_cost": None,
-                    "total_profit": None,
-                    "profit_margin_pct": None,
-                    "profit_rows": None,
-                    "loss_rows": None,
-                    "neutral_rows": None,
-                    "message": "Upload data to calculate business performance.",
-                },
-                "profit_loss_breakdown": {
-                    "segment_column": None,
-                    "rows": [],
-                    "top_profit_segments": [],
-                    "top_loss_segments": [],
-                    "message": "No data available for profit/loss breakdown.",
-                },
-                "simplified_trend": None,
-                "chart_explanations": ["Upload data to enable simplified chart explanations."],
-                "key_drivers": {
-                    "positive_drivers": [],
-                    "negative_drivers": [],
-                },
-                "alerts": [],
-                "precision_audit": {
-                    "numeric_columns_used": [],
-                    "coerced_numeric_columns": [],
-                    "ignored_numeric_columns": [],
-                    "coercion_confidence": 1.0,
-                    "notes": ["Dataset has no rows yet."],
-                },
-            },
+        payload = _EMPTY_NO_ROWS.model_copy(
+            update={"dataset_id": dataset.id, "last_updated": dataset.updated_at}
         )
         _cache_metrics(dataset.id, cache_key, now, payload)
         return payload
 
-    row_data = [row.row_data for row in rows]
-    df = pd.DataFrame(row_data)
-    prepared_df, numeric_cols, numeric_audit = prepare_numeric_dataframe(df)
-
-    basic_stats: dict[str, dict[str, float]] = {}
-    for col in numeric_cols:
-        series = pd.to_numeric(prepared_df[col], errors="coerce").dropna()
-        if series.empty:
-            continue
-        basic_stats[col] = {
-            "min": float(series.min()),
-            "max": float(series.max()),
-            "avg": float(series.mean()),
-        }
-
-    chart_data: list[dict] = []
-    if numeric_cols:
-        label_col = None
-        string_cols = prepared_df.select_dtypes(include=["object", "string"]).columns.tolist()
-        if string_cols:
-            for col in string_cols:
-                if any(token in col.lower() for token in ["name", "date", "product", "month", "category"]):
-                    label_col = col
-                    break
-            if not label_col:
-                label_col = string_cols[0]
-
-        subset = prepared_df.head(10).copy()
-        if label_col:
-            subset["name"] = subset[label_col].astype(str)
-        else:
-            subset["name"] = subset.index.astype(str)
-
-        chart_data = subset[["name"] + numeric_cols].to_dict(orient="records")
-
-    analyst_insights = build_analyst_insights(prepared_df, numeric_audit=numeric_audit)
-
-    payload = OverviewMetrics(
-        dataset_id=dataset.id,
-        total_rows=len(df),
-        total_columns=len(df.columns),
-        numeric_columns=numeric_cols,
-        last_updated=dataset.updated_at or datetime.now(),
-        basic_stats=basic_stats,
-        chart_data=chart_data,
-        analyst_insights=analyst_insights,
-    )
+    # DataFrame construction and the analyst pass are CPU-bound; keep them off the event loop.
+    payload = await asyncio.to_thread(_compute_metrics, rows, dataset)
 
     _cache_metrics(dataset.id, cache_key, now, payload)
     return payload
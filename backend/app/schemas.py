@@ -68,6 +68,13 @@ class AuthTokenResponse(BaseModel):
     expires_in: int
     user: AuthUser
 
+
+class AccessTokenClaims(BaseModel):
+    sub: int
+    tenant_id: int
+    role: Optional[str] = None
+    type: Literal["access"]
+
 # Dataset Schemas
 class DatasetBase(BaseModel):
     name: str
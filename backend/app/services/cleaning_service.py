@@ -153,12 +153,22 @@ def _jsonable_value(value: Any) -> Any:
     return value
 
 
+def _json_record_value(value: Any) -> Any:
+    # itertuples already unboxes numeric cells to Python scalars, so only NaN floats and
+    # timestamps/NA/numpy objects need the general conversion.
+    if type(value) is float:
+        return None if value != value else value
+    if type(value) in (str, int, bool):
+        return value
+    return _jsonable_value(value)
+
+
 def dataframe_to_json_records(df: pd.DataFrame) -> list[dict[str, Any]]:
-    normalized = df.where(pd.notnull(df), None)
-    records: list[dict[str, Any]] = []
-    for _, row in normalized.iterrows():
-        records.append({str(col): _jsonable_value(value) for col, value in row.items()})
-    return records
+    columns = [str(col) for col in df.columns]
+    return [
+        {col: _json_record_value(value) for col, value in zip(columns, row)}
+        for row in df.itertuples(index=False, name=None)
+    ]
 
 
 def build_cleaning_suggestions(df: pd.DataFrame) -> list[dict[str, Any]]:
@@ -7,12 +7,13 @@ from io import StringIO
 from typing import Any
 
 import pandas as pd
-from sqlalchemy import create_engine, insert, select
+from sqlalchemy import create_engine, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.database import AsyncSessionLocal
-from app.models import ConnectorSyncRun, DataConnector, DataRow, Dataset
+from app.models import ConnectorSyncRun, DataConnector, Dataset
 from app.services.cleaning_service import dataframe_to_json_records
+from app.services.data_rows_service import insert_data_rows
 
 GOOGLE_SHEET_ID_PATTERN = re.compile(r"/spreadsheets/d/([a-zA-Z0-9-_]+)")
 
@@ -76,7 +77,7 @@ async def sync_connector(
         if df.empty:
             raise ValueError("Connector returned no rows.")
 
-        schema_info = {str(col): str(df[col].dtype) for col in df.columns}
+        schema_info = df.dtypes.astype(str).rename(index=str).to_dict()
         dataset_name = (connector.target_dataset_name or "").strip() or connector.name
         dataset = Dataset(
             tenant_id=connector.tenant_id,
@@ -90,17 +91,12 @@ async def sync_connector(
         db.add(dataset)
         await db.flush()
 
-        records = dataframe_to_json_records(df)
-        rows_to_insert = [
-            {
-                "tenant_id": connector.tenant_id,
-                "dataset_id": dataset.id,
-                "row_data": row,
-            }
-            for row in records
-        ]
-        if rows_to_insert:
-            await db.execute(insert(DataRow), rows_to_insert)
+        await insert_data_rows(
+            db,
+            tenant_id=connector.tenant_id,
+            dataset_id=dataset.id,
+            records=dataframe_to_json_records(df),
+        )
 
         now = datetime.now(timezone.utc)
         run.status = "success"
@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+from collections.abc import Sequence
+from typing import Any
+
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import dumps_json
+from app.models import DataRow
+
+# Rows per executemany. SQLAlchemy's insertmanyvalues pages each call into multi-row VALUES
+# statements, and bounded calls keep parameter lists and driver buffers from growing with the file.
+INSERT_BATCH_ROWS = 10_000
+
+
+async def _copy_data_rows(
+    connection: Any,
+    *,
+    tenant_id: int,
+    dataset_id: int,
+    records: Sequence[dict[str, Any]],
+) -> None:
+    await connection.copy_records_to_table(
+        DataRow.__tablename__,
+        records=((tenant_id, dataset_id, dumps_json(record)) for record in records),
+        columns=["tenant_id", "dataset_id", "row_data"],
+    )
+
+
+async def insert_data_rows(
+    db: AsyncSession,
+    *,
+    tenant_id: int,
+    dataset_id: int,
+    records: Sequence[dict[str, Any]],
+) -> None:
+    """Insert row dicts for a dataset within the caller's transaction.
+
+    On PostgreSQL (asyncpg) rows are streamed with binary COPY, which skips per-statement
+    parse/plan work entirely; other databases get fixed-size executemany batches.
+    """
+    if not records:
+        return
+
+    connection = await db.connection()
+    if connection.dialect.name == "postgresql" and connection.dialect.driver == "asyncpg":
+        # Same connection, so the COPY commits or rolls back with the caller's transaction.
+        raw_connection = await connection.get_raw_connection()
+        await _copy_data_rows(
+            raw_connection.driver_connection,
+            tenant_id=tenant_id,
+            dataset_id=dataset_id,
+            records=records,
+        )
+        return
+
+    for start in range(0, len(records), INSERT_BATCH_ROWS):
+        await db.execute(
+            insert(DataRow),
+            [
+                {"tenant_id": tenant_id, "dataset_id": dataset_id, "row_data": record}
+                for record in records[start : start + INSERT_BATCH_ROWS]
+            ],
+        )
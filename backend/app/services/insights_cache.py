@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+import time
+from collections import OrderedDict
+
+from app.config import get_settings
+from app.models import Dataset
+
+settings = get_settings()
+
+_MAX_ENTRIES = 128
+# (tenant_id, dataset_id) -> (dataset_version, expires_at, insights)
+_INSIGHTS_CACHE: OrderedDict[tuple[int, int], tuple[str, float, dict]] = OrderedDict()
+
+
+def dataset_version(dataset: Dataset) -> str:
+    updated = dataset.updated_at or dataset.created_at
+    return f"{dataset.row_count}:{updated.isoformat() if updated else 'none'}"
+
+
+def get_cached_insights(dataset: Dataset) -> dict | None:
+    """Return analyst insights for the AI routes' analysis window if still current."""
+    key = (dataset.tenant_id, dataset.id)
+    entry = _INSIGHTS_CACHE.get(key)
+    if entry is None:
+        return None
+    version, expires_at, insights = entry
+    if version != dataset_version(dataset) or expires_at <= time.monotonic():
+        _INSIGHTS_CACHE.pop(key, None)
+        return None
+    _INSIGHTS_CACHE.move_to_end(key)
+    return insights
+
+
+def store_insights(dataset: Dataset, insights: dict) -> None:
+    key = (dataset.tenant_id, dataset.id)
+    _INSIGHTS_CACHE[key] = (
+        dataset_version(dataset),
+        time.monotonic() + settings.insights_cache_ttl_seconds,
+        insights,
+    )
+    _INSIGHTS_CACHE.move_to_end(key)
+    while len(_INSIGHTS_CACHE) > _MAX_ENTRIES:
+        _INSIGHTS_CACHE.popitem(last=False)
+
+
+def invalidate_tenant_insights(tenant_id: int) -> None:
+    """Drop every cached entry for a tenant; dataset ids can be reused after a clear."""
+    for key in [key for key in _INSIGHTS_CACHE if key[0] == tenant_id]:
+        _INSIGHTS_CACHE.pop(key, None)
@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from typing import Any, Protocol
+
+from app.config import get_settings
+
+settings = get_settings()
+
+# Above this temperature completions are meant to vary, so replaying a stored answer would be wrong.
+MAX_CACHEABLE_TEMPERATURE = 0.2
+
+
+class LLMCacheBackend(Protocol):
+    def get(self, key: str) -> Any | None: ...
+
+    def set(self, key: str, value: Any, ttl_seconds: int) -> None: ...
+
+
+class InMemoryLLMCacheBackend:
+    """Process-local LRU with per-entry expiry."""
+
+    def __init__(self, max_entries: int) -> None:
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+
+    def get(self, key: str) -> Any | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            self._entries.pop(key, None)
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: Any, ttl_seconds: int) -> None:
+        self._entries[key] = (time.monotonic() + ttl_seconds, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+
+class LLMCache:
+    def __init__(self, backend: LLMCacheBackend, ttl_seconds: int) -> None:
+        self.backend = backend
+        self.ttl_seconds = ttl_seconds
+
+    @staticmethod
+    def cache_key(model: str, messages: list[dict[str, str]], temperature: float) -> str:
+        raw = json.dumps(
+            {"model": model, "messages": messages, "temperature": temperature},
+            sort_keys=True,
+            default=str,
+        )
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def is_cacheable(temperature: float) -> bool:
+        return settings.llm_cache_enabled and temperature <= MAX_CACHEABLE_TEMPERATURE
+
+    def get(self, key: str) -> Any | None:
+        return self.backend.get(key)
+
+    def set(self, key: str, value: Any) -> None:
+        self.backend.set(key, value, self.ttl_seconds)
+
+
+llm_cache = LLMCache(
+    InMemoryLLMCacheBackend(max_entries=settings.llm_cache_max_entries),
+    ttl_seconds=settings.llm_cache_ttl_seconds,
+)
@@ -0,0 +1,28 @@
+from __future__ import annotations
+
+import time
+
+_TTL_SECONDS = 5
+_MAX_ENTRIES = 1_000
+# (tenant_id, limit) -> (expires_at, rendered body). The history panel polls /ai/queries, so
+# the rendered page is reused until a write to the tenant's AI queries invalidates it.
+_QUERY_LIST_CACHE: dict[tuple[int, int], tuple[float, bytes]] = {}
+
+
+def get_cached_query_list(tenant_id: int, limit: int) -> bytes | None:
+    entry = _QUERY_LIST_CACHE.get((tenant_id, limit))
+    if entry is None or entry[0] <= time.monotonic():
+        return None
+    return entry[1]
+
+
+def store_query_list(tenant_id: int, limit: int, body: bytes) -> None:
+    if len(_QUERY_LIST_CACHE) >= _MAX_ENTRIES:
+        _QUERY_LIST_CACHE.clear()
+    _QUERY_LIST_CACHE[(tenant_id, limit)] = (time.monotonic() + _TTL_SECONDS, body)
+
+
+def invalidate_tenant_query_list(tenant_id: int) -> None:
+    """Drop this process's cached query lists for a tenant; other processes expire within the TTL."""
+    for key in [key for key in _QUERY_LIST_CACHE if key[0] == tenant_id]:
+        _QUERY_LIST_CACHE.pop(key, None)
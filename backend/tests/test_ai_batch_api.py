@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+import json
+from types import SimpleNamespace
+
+
+class _FakeBatchClient:
+    """Just enough of AsyncOpenAI's files/batches API for the batch worker."""
+
+    def __init__(self, *, fail_uploads: bool = False) -> None:
+        self.fail_uploads = fail_uploads
+        self.uploads: list[str] = []
+        self.files = SimpleNamespace(create=self._create_file, content=self._file_content)
+        self.batches = SimpleNamespace(create=self._create_batch, retrieve=self._retrieve_batch)
+
+    async def _create_file(self, *, file, purpose):
+        if self.fail_uploads:
+            raise RuntimeError("upload failed")
+        self.uploads.append(file[1].decode("utf-8"))
+        return SimpleNamespace(id=f"file-{len(self.uploads)}")
+
+    async def _create_batch(self, *, input_file_id, endpoint, completion_window):
+        return SimpleNamespace(id=f"batch-{input_file_id}")
+
+    async def _retrieve_batch(self, batch_id):
+        return SimpleNamespace(status="completed", output_file_id=batch_id.removeprefix("batch-"))
+
+    async def _file_content(self, file_id):
+        upload = self.uploads[int(file_id.removeprefix("file-")) - 1]
+        lines = []
+        for line in upload.splitlines():
+            custom_id = json.loads(line)["custom_id"]
+            body = {"choices": [{"message": {"content": f"Batch answer for {custom_id}"}}]}
+            lines.append(json.dumps({"custom_id": custom_id, "response": {"body": body}}))
+        return SimpleNamespace(text="\n".join(lines))
+
+
+def _upload_dataset(client, headers: dict[str, str]) -> int:
+    csv_content = "month,revenue,cost,region\n2025-01,100,70,North\n2025-02,120,75,South\n2025-03,90,80,South\n"
+    response = client.post(
+        "/datasets/upload",
+        headers=headers,
+        files={"file": ("batch.csv", csv_content, "text/csv")},
+    )
+    assert response.status_code == 200, response.text
+    return int(response.json()["dataset_id"])
+
+
+def _queue_batch_query(client, headers: dict[str, str], dataset_id: int) -> dict:
+    response = client.post(
+        "/ai/query?mode=batch",
+        headers=headers,
+        json={"dataset_id": dataset_id, "prompt": "Which region is most profitable?"},
+    )
+    assert response.status_code == 202, response.text
+    return response.json()
+
+
+def _load_query(client, query_id: int):
+    from sqlalchemy.orm import undefer
+
+    from app.database import AsyncSessionLocal
+    from app.models import AIQuery
+
+    async def _load():
+        async with AsyncSessionLocal() as db:
+            return await db.get(AIQuery, query_id, options=[undefer(AIQuery.batch_request)])
+
+    return client.portal.call(_load)
+
+
+def test_batch_query_hides_request_and_is_submitted_once(client, auth_headers, monkeypatch):
+    from app.routers import ai
+    from app.services.ai_batch_service import collect_finished_batch_queries, submit_queued_batch_queries
+
+    fake_client = _FakeBatchClient()
+    monkeypatch.setattr(ai, "client", fake_client)
+    dataset_id = _upload_dataset(client, auth_headers)
+
+    queued = _queue_batch_query(client, auth_headers, dataset_id)
+    assert queued["generated_code"] is None
+    assert queued["result_data"]["batch"] == {"status": "queued"}
+
+    listed = client.get("/ai/queries", headers=auth_headers).json()["queries"]
+    listed_query = next(item for item in listed if item["id"] == queued["id"])
+    assert listed_query["result_data"]["batch"] == {"status": "queued"}
+    assert _load_query(client, queued["id"]).batch_request["messages"]
+
+    batch_id = client.portal.call(submit_queued_batch_queries, fake_client)
+    assert batch_id is not None
+    # The rows are claimed, so a second worker cycle has nothing left to submit.
+    assert client.portal.call(submit_queued_batch_queries, fake_client) is None
+    assert len(fake_client.uploads) == 1
+
+    assert client.portal.call(collect_finished_batch_queries, fake_client) == 1
+    finished = _load_query(client, queued["id"])
+    assert finished.batch_status == "completed"
+    assert finished.generated_code.endswith(f"Batch answer for aiq-{queued['id']}")
+    assert finished.result_data["batch"] == {"status": "completed", "batch_id": batch_id}
+    assert finished.batch_request is None
+
+    # The cached /ai/queries page is dropped when the worker finishes the batch...
+    listed = client.get("/ai/queries", headers=auth_headers).json()["queries"]
+    listed_query = next(item for item in listed if item["id"] == queued["id"])
+    assert listed_query["result_data"]["batch"]["status"] == "completed"
+    # ...and when a new upload clears the tenant's previous queries.
+    _upload_dataset(client, auth_headers)
+    listed = client.get("/ai/queries", headers=auth_headers).json()["queries"]
+    assert all(item["id"] != queued["id"] for item in listed)
+
+
+def test_batch_submission_fails_after_max_attempts(client, auth_headers, monkeypatch):
+    from app.routers import ai
+    from app.services.ai_batch_service import MAX_SUBMIT_ATTEMPTS, submit_queued_batch_queries
+
+    failing_client = _FakeBatchClient(fail_uploads=True)
+    monkeypatch.setattr(ai, "client", failing_client)
+    dataset_id = _upload_dataset(client, auth_headers)
+    queued = _queue_batch_query(client, auth_headers, dataset_id)
+
+    for attempt in range(1, MAX_SUBMIT_ATTEMPTS + 1):
+        assert client.portal.call(submit_queued_batch_queries, failing_client) is None
+        query = _load_query(client, queued["id"])
+        assert query.batch_attempts == attempt
+        expected_status = "failed" if attempt == MAX_SUBMIT_ATTEMPTS else "queued"
+        assert query.batch_status == expected_status
+
+    assert query.generated_code
+    assert query.result_data["generated"] is False
+    assert query.batch_request is None
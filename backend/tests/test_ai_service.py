@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+import json
+from types import SimpleNamespace
+
+
+class _FakeStream:
+    def __init__(self, content: str) -> None:
+        self._content = content
+
+    async def __aiter__(self):
+        yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=self._content))])
+
+    async def close(self) -> None:
+        pass
+
+
+class _FakeChatClient:
+    """Streams a canned bulk answer that covers every dataset in the prompt except the last."""
+
+    def __init__(self) -> None:
+        self.calls: list[dict] = []
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+    async def _create(self, **kwargs):
+        call_index = len(self.calls)
+        self.calls.append(kwargs)
+        dataset_count = kwargs["messages"][-1]["content"].count("### DATASET")
+        results = [
+            {"summary": f"call{call_index}-item{index}", "key_insights": [f"insight {index}"]}
+            for index in range(dataset_count - 1)
+        ]
+        return _FakeStream(json.dumps({"results": results}))
+
+
+def _summary_job(index: int):
+    from app.services.ai_service import SummaryJob
+
+    return SummaryJob(
+        row_count=10 + index,
+        columns=[f"bulk_col_{index}", "revenue"],
+        sample_data=[{f"bulk_col_{index}": "a", "revenue": index}],
+        numeric_stats={"revenue": {"avg": float(index), "max": float(index)}},
+    )
+
+
+def _openai_service(client):
+    from app.services.ai_service import AIService
+
+    service = AIService()
+    service.client = client
+    service.provider = "openai"
+    return service
+
+
+def test_bulk_summaries_are_chunked_and_fall_back_per_missing_result(client):
+    from app.services.ai_service import _BULK_SUMMARY_MAX_JOBS, _SUMMARY_MAX_TOKENS
+
+    fake_client = _FakeChatClient()
+    service = _openai_service(fake_client)
+    jobs = [_summary_job(index) for index in range(_BULK_SUMMARY_MAX_JOBS + 2)]
+
+    summaries = client.portal.call(service.summarize_datasets_bulk, jobs)
+
+    assert len(fake_client.calls) == 2
+    assert all(call["max_tokens"] <= _SUMMARY_MAX_TOKENS * _BULK_SUMMARY_MAX_JOBS for call in fake_client.calls)
+    assert len(summaries) == len(jobs)
+    # Results map back to jobs by position within each chunk.
+    assert summaries[0]["summary"] == "call0-item0"
+    assert summaries[_BULK_SUMMARY_MAX_JOBS - 2]["summary"] == f"call0-item{_BULK_SUMMARY_MAX_JOBS - 2}"
+    assert summaries[_BULK_SUMMARY_MAX_JOBS]["summary"] == "call1-item0"
+    # The last job of each chunk is missing from the answer and gets the heuristic summary.
+    for index in (_BULK_SUMMARY_MAX_JOBS - 1, _BULK_SUMMARY_MAX_JOBS + 1):
+        assert summaries[index]["summary"].startswith(f"This dataset contains {10 + index} rows")
+
+
+def test_poll_summary_batch_maps_custom_ids_and_strips_fences(client, monkeypatch):
+    from app.services import ai_service
+
+    answers = {
+        "ds-7": '```json\n{"summary": "Fenced", "key_insights": ["a"]}\n```',
+        "ds-8": '{"summary": "Plain", "key_insights": []}',
+        "ds-9": "not json",
+        "aiq-3": '{"summary": "Someone else\'s batch row"}',
+    }
+    fetched: list[str] = []
+
+    async def fake_fetch_batch_answers(_client, batch_id):
+        fetched.append(batch_id)
+        return answers if batch_id == "batch-done" else None
+
+    monkeypatch.setattr(ai_service, "fetch_batch_answers", fake_fetch_batch_answers)
+    service = _openai_service(_FakeChatClient())
+
+    assert client.portal.call(service.poll_summary_batch, "batch-running") is None
+    summaries = client.portal.call(service.poll_summary_batch, "batch-done")
+
+    assert fetched == ["batch-running", "batch-done"]
+    assert summaries == {
+        7: {"summary": "Fenced", "key_insights": ["a"]},
+        8: {"summary": "Plain", "key_insights": []},
+    }
@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+
+def test_upload_keeps_iso_dates_as_text(client, auth_headers):
+    csv_content = (
+        "order_date,ordered_at,revenue\n"
+        "2025-01-01,2025-01-01 10:00:00,100\n"
+        "2025-01-02,2025-01-02 11:30:00,120\n"
+    )
+    upload_response = client.post(
+        "/datasets/upload",
+        headers=auth_headers,
+        files={"file": ("dates.csv", csv_content, "text/csv")},
+    )
+    assert upload_response.status_code == 200, upload_response.text
+    dataset_id = int(upload_response.json()["dataset_id"])
+
+    data_response = client.get(f"/datasets/{dataset_id}/data", headers=auth_headers)
+    assert data_response.status_code == 200, data_response.text
+    rows = data_response.json()["data"]
+    assert rows[0]["order_date"] == "2025-01-01"
+    assert rows[0]["ordered_at"] == "2025-01-01 10:00:00"
+    assert rows[1]["revenue"] == 120
+
+
+def test_parsed_csv_schema_reports_dates_as_object(client, tmp_path):
+    # Imported after the client fixture has configured settings for the test app.
+    from app.routers.datasets import _arrow_dtype_name, _parse_csv_table
+
+    csv_path = tmp_path / "dates.csv"
+    csv_path.write_text("order_date,ordered_at,revenue\n2025-01-01,2025-01-01 10:00:00,100\n")
+
+    table = _parse_csv_table(str(csv_path), "utf-8")
+
+    schema_info = {field.name: _arrow_dtype_name(field.type) for field in table.schema}
+    assert schema_info == {"order_date": "object", "ordered_at": "object", "revenue": "int64"}
+
+
+def test_upload_rejects_unparseable_csv(client, auth_headers):
+    csv_content = "a,b\n1,2\n3,4,5\n"
+    response = client.post(
+        "/datasets/upload",
+        headers=auth_headers,
+        files={"file": ("broken.csv", csv_content, "text/csv")},
+    )
+    assert response.status_code == 400, response.text
+    assert response.json()["detail"].startswith("Failed to parse CSV")
+
+
+def _upload_and_fetch_rows(client, auth_headers, csv_content: str) -> list[dict]:
+    upload_response = client.post(
+        "/datasets/upload",
+        headers=auth_headers,
+        files={"file": ("rows.csv", csv_content, "text/csv")},
+    )
+    assert upload_response.status_code == 200, upload_response.text
+    dataset_id = int(upload_response.json()["dataset_id"])
+    data_response = client.get(f"/datasets/{dataset_id}/data", headers=auth_headers)
+    assert data_response.status_code == 200, data_response.text
+    return data_response.json()["data"]
+
+
+def test_upload_dedupes_headers_without_dropping_columns(client, auth_headers):
+    rows = _upload_and_fetch_rows(client, auth_headers, "a,a,a.1\n1,2,3\n")
+    assert rows == [{"a": 1, "a.2": 2, "a.1": 3}]
+
+
+def test_upload_names_empty_headers_like_pandas(client, auth_headers):
+    rows = _upload_and_fetch_rows(client, auth_headers, "a,,b,\n1,2,3,4\n")
+    assert rows == [{"a": 1, "Unnamed: 1": 2, "b": 3, "Unnamed: 3": 4}]
+
+
+def test_upload_pads_short_rows_with_nulls(client, auth_headers):
+    rows = _upload_and_fetch_rows(client, auth_headers, "a,b,c\n1,2,3\n4,5\n")
+    assert rows[0] == {"a": 1, "b": 2, "c": 3}
+    assert rows[1] == {"a": 4, "b": 5, "c": None}